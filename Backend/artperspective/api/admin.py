@@ -1,8 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
+from django.utils import timezone
 
 from paintings.models import Artist, Tags, Painting, PaintingTag, Favorite
+from tasks.models import Task
 
 User = get_user_model()
 typ = PaintingTag
@@ -51,3 +53,18 @@ class FavoriteAdmin(admin.ModelAdmin):
 @admin.register(User)
 class ArtPerspectiveUserAdmin(UserAdmin):
     pass
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_after", "updated_at")
+    list_filter = ("status", "name")
+    search_fields = ("name",)
+    readonly_fields = ("created_at", "updated_at", "last_error")
+    actions = ["retry"]
+
+    @admin.action(description="Повторить выбранные задачи")
+    def retry(self, request, queryset):
+        queryset.update(
+            status=Task.Status.PENDING, attempts=0, run_after=timezone.now()
+        )
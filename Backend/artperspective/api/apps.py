@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+
+        from api import signals  # noqa: F401
+
+        if settings.INSTRUMENTATION:
+            from api import instrumentation
+
+            instrumentation.install()
@@ -0,0 +1,139 @@
+"""
+Сценарии бенчмарка API для manage.py benchmark.
+
+Сценарий — генератор, который отдаёт запросы (метод, путь) и получает
+ответ на предыдущий, поэтому может, например, идти по курсору next.
+Запросы выполняются тестовым клиентом DRF в том же процессе, так что
+вместе с задержкой считается и число SQL-запросов. Данные для больших
+каталогов создаёт manage.py generate_catalogue.
+"""
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Сколько страниц ленты листает сценарий paintings.
+PAGES = 5
+
+
+@dataclass
+class Catalogue:
+    painting_ids: list
+    artist_ids: list
+    words: list
+    # Избранное пользователя бенчмарка: сценарий favorite его не трогает.
+    favorite_ids: set = field(default_factory=set)
+    rng: random.Random = field(default_factory=random.Random)
+
+
+@dataclass
+class Sample:
+    latency: float
+    queries: int
+    status: int
+
+
+def percentile(values, fraction):
+    """Перцентиль по отсортированному списку (метод ближайшего ранга)."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def paintings(catalogue):
+    path = "/api/paintings/"
+    for _ in range(PAGES):
+        response = yield "get", path
+        if response.status_code != 200:
+            return
+        path = response.json()["next"]
+        if not path:
+            return
+
+
+def popular(catalogue):
+    yield "get", "/api/paintings/?ordering=-favorites_count"
+
+
+def search(catalogue):
+    word = catalogue.rng.choice(catalogue.words)
+    yield "get", f"/api/paintings/?search={word}"
+
+
+def similar(catalogue):
+    painting_id = catalogue.rng.choice(catalogue.painting_ids)
+    yield "get", f"/api/paintings/{painting_id}/similar/"
+
+
+def recommendations(catalogue):
+    yield "get", "/api/recommendations/"
+
+
+def artist(catalogue):
+    artist_id = catalogue.rng.choice(catalogue.artist_ids)
+    yield "get", f"/api/artists/{artist_id}/"
+
+
+def artists(catalogue):
+    yield "get", "/api/artists/"
+
+
+def favorite(catalogue):
+    painting_id = catalogue.rng.choice(catalogue.painting_ids)
+    while painting_id in catalogue.favorite_ids:
+        painting_id = catalogue.rng.choice(catalogue.painting_ids)
+    yield "post", f"/api/paintings/{painting_id}/favorite/"
+    yield "delete", f"/api/paintings/{painting_id}/favorite/"
+
+
+SCENARIOS = {
+    "paintings": paintings,
+    "popular": popular,
+    "search": search,
+    "similar": similar,
+    "recommendations": recommendations,
+    "artist": artist,
+    "artists": artists,
+    "favorite": favorite,
+}
+
+
+def run(scenario, client, catalogue, iterations):
+    """Выполняет сценарий iterations раз; возвращает (образцы, секунды)."""
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        steps = scenario(catalogue)
+        response = None
+        while True:
+            try:
+                method, path = steps.send(response)
+            except StopIteration:
+                break
+            with CaptureQueriesContext(connection) as queries:
+                request_started = time.perf_counter()
+                response = getattr(client, method)(path)
+                latency = time.perf_counter() - request_started
+            samples.append(
+                Sample(latency, len(queries), response.status_code)
+            )
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    queries = [sample.queries for sample in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(sample.status >= 400 for sample in samples),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "queries_avg": statistics.fmean(queries) if queries else 0.0,
+        "queries_max": max(queries, default=0),
+    }
@@ -0,0 +1,169 @@
+"""
+Кеш ответов read-only API для анонимных пользователей.
+
+Ключ строится из пути и отсортированных query-параметров и включает
+номер версии. Любое изменение каталога увеличивает версию (см.
+api.signals), и все старые ключи разом перестают читаться — удалять их
+не нужно, они истекут по таймауту. Версию увеличивают и другие
+процессы (import_catalogue, build_similarity, воркер задач), поэтому
+кеш должен быть общим: при REDIS_URL — Redis (в боевом профиле
+обязателен), без него — локальная память процесса, годная только для
+разработки.
+"""
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+
+VERSION_KEY = "api-cache:version"
+# Время последнего bump_version(): Last-Modified ответов каталога.
+MODIFIED_KEY = "api-cache:modified"
+HITS_KEY = "api-cache:hits"
+MISSES_KEY = "api-cache:misses"
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    """Инвалидирует все закешированные ответы."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+    cache.set(MODIFIED_KEY, timezone.now(), timeout=None)
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def stats():
+    cache = get_cache()
+    return {
+        "version": get_version(),
+        "hits": cache.get(HITS_KEY, 0),
+        "misses": cache.get(MISSES_KEY, 0),
+    }
+
+
+def make_key(request):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    digest = hashlib.md5(
+        f"{request.path}?{query}".encode("utf-8"), usedforsecurity=False
+    ).hexdigest()
+    return f"api-cache:{get_version()}:{digest}"
+
+
+def cached_value(name, compute, timeout=None):
+    """
+    Значение, общее для всех пользователей (например, фасеты всего
+    каталога), под текущей версией кеша: compute() вызывается только при
+    промахе.
+    """
+    if timeout is None:
+        timeout = settings.API_CACHE_TIMEOUT
+    cache = get_cache()
+    key = f"api-cache:{get_version()}:{name}"
+    value = cache.get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+    _count(MISSES_KEY)
+    value = compute()
+    cache.set(key, value, timeout)
+    return value
+
+
+def is_cacheable(request):
+    return request.method == "GET" and not request.user.is_authenticated
+
+
+class CachedReadMixin:
+    """
+    Кеширует данные ответов list/retrieve для анонимных запросов.
+    Хранится уже сериализованный response.data, поэтому формат ответа
+    по-прежнему выбирается согласованием контента.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    def cached(self, handler, request, *args, **kwargs):
+        if not is_cacheable(request):
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = make_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _count(HITS_KEY)
+            return Response(data)
+        _count(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+def cache_anonymous(view, timeout=None):
+    """
+    То же для обычных Django-представлений: хранит готовое тело вместе с
+    Last-Modified. timeout по умолчанию — API_CACHE_TIMEOUT.
+    """
+    if timeout is None:
+        timeout = settings.API_CACHE_TIMEOUT
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+        cache = get_cache()
+        key = make_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            _count(HITS_KEY)
+            content, content_type, last_modified = cached
+            response = HttpResponse(content, content_type=content_type)
+            if last_modified:
+                response["Last-Modified"] = last_modified
+            return response
+        _count(MISSES_KEY)
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        if response.status_code == 200:
+            cache.set(
+                key,
+                (
+                    response.content,
+                    response["Content-Type"],
+                    response.get("Last-Modified"),
+                ),
+                timeout,
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,140 @@
+"""
+Сжатие ответов: brotli или gzip по Accept-Encoding.
+
+Сжимаются ответы от COMPRESSION_MIN_SIZE байт и потоковые ответы;
+кодировка выбирается по q-значениям клиента, при равенстве — brotli.
+brotli — необязательная зависимость, без него остаётся gzip. Качество
+brotli умеренное: 11 (по умолчанию в библиотеке) для динамических
+ответов слишком медленно.
+"""
+import zlib
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+# Как в GZipMiddleware Django: случайные байты против BREACH.
+GZIP_MAX_RANDOM_BYTES = 100
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate(accept_encoding, available=ENCODINGS):
+    """Лучшая из available кодировок для заголовка Accept-Encoding."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def compressor(encoding):
+    """(сжать кусок, сбросить буфер, завершить) для потокового ответа."""
+    if encoding == "br":
+        stream = brotli.Compressor(quality=BROTLI_QUALITY)
+        return stream.process, stream.flush, stream.finish
+    # wbits 16 + MAX_WBITS — формат gzip, а не голый zlib.
+    stream = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    sync_flush = partial(stream.flush, zlib.Z_SYNC_FLUSH)
+    return stream.compress, sync_flush, stream.flush
+
+
+def compress_stream(chunks, encoding):
+    process, flush, finish = compressor(encoding)
+    for chunk in chunks:
+        # Сброс после каждого куска: клиент получает данные по мере
+        # генерации, а не после конца ответа.
+        yield process(chunk) + flush()
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding):
+    process, flush, finish = compressor(encoding)
+    async for chunk in chunks:
+        yield process(chunk) + flush()
+    yield finish()
+
+
+class CompressionMiddleware:
+    """Ставить в начало MIDDLEWARE: сжатие — последний шаг ответа."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process(request, await self.get_response(request))
+
+    def process(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, encoding
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Сжатое тело — другое представление: сильный ETag становится
+        # слабым, как в GZipMiddleware.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,122 @@
+"""
+Условные GET-запросы (ETag/Last-Modified) для list/retrieve.
+
+Валидаторы не требуют запросов к базе: ETag — хеш версии кеша ответов
+(её увеличивает любая правка каталога, см. api.signals), отметок
+времени правок избранного (общей — от неё зависит favorites_count, и
+пользователя — от неё зависит is_favorite), пользователя, адреса и
+Accept. Last-Modified — самая поздняя из отметок. Всё это читается
+одним get_many из кеша, поэтому 304 дешевле даже попадания в кеш
+ответов. Отметки ставятся после коммита, чтобы ETag нового состояния не
+выдали вместе со старыми данными.
+"""
+import hashlib
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from api.cache import MODIFIED_KEY, VERSION_KEY, get_cache
+
+FAVORITES_KEY = "conditional:favorites"
+USER_FAVORITES_KEY = "conditional:favorites:{}"
+
+
+def _touch_favorites(user_id):
+    now = timezone.now()
+    get_cache().set_many(
+        {FAVORITES_KEY: now, USER_FAVORITES_KEY.format(user_id): now},
+        timeout=None,
+    )
+
+
+def touch_favorites(user_id):
+    """Отмечает правку избранного пользователя после коммита."""
+    transaction.on_commit(partial(_touch_favorites, user_id))
+
+
+def catalogue_validators(user):
+    """
+    (значения для ETag, Last-Modified) состояния каталога и избранного.
+    Вытесненная из кеша отметка заново ставится в «сейчас»: лишний 200
+    вместо ложного 304.
+    """
+    keys = [VERSION_KEY, MODIFIED_KEY, FAVORITES_KEY]
+    if user.is_authenticated:
+        keys.append(USER_FAVORITES_KEY.format(user.pk))
+    cache = get_cache()
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, 1 if key == VERSION_KEY else timezone.now(), None)
+            values[key] = cache.get(key)
+    stamps = [values[key] for key in keys if key != VERSION_KEY]
+    return (
+        [values[key] for key in keys],
+        max(filter(None, stamps), default=None),
+    )
+
+
+class ConditionalGetMixin:
+    """Ставить перед CachedReadMixin: 304 дешевле даже попадания в кеш."""
+
+    def get_validators(self):
+        """(значения для ETag, datetime последнего изменения) или None."""
+        return catalogue_validators(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        validators = self.get_validators()
+        response = self.not_modified(request, validators)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_validators(request, response, validators)
+
+    def make_etag(self, request, values):
+        source = repr(
+            (
+                values,
+                request.user.pk,
+                request.get_full_path(),
+                request.headers.get("Accept"),
+            )
+        )
+        digest = hashlib.md5(
+            source.encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        return f'W/"{digest}"'
+
+    def not_modified(self, request, validators):
+        if validators is None:
+            return None
+        values, last_modified = validators
+        return get_conditional_response(
+            request,
+            etag=self.make_etag(request, values),
+            last_modified=(
+                int(last_modified.timestamp()) if last_modified else None
+            ),
+        )
+
+    def set_validators(self, request, response, validators):
+        if validators is None or response.status_code not in (200, 304):
+            return response
+        values, last_modified = validators
+        response["ETag"] = self.make_etag(request, values)
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        # Без no-cache браузер может счесть ответ свежим по Last-Modified
+        # и не спросить сервер.
+        response["Cache-Control"] = (
+            "private, no-cache" if request.user.is_authenticated
+            else "no-cache"
+        )
+        patch_vary_headers(response, ("Accept", "Authorization"))
+        return response
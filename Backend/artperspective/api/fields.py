@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from paintings.images import FORMATS, ready_field, srcset
+
+
+class SrcsetField(serializers.ReadOnlyField):
+    """
+    srcset производных изображения (см. paintings.images) по форматам:
+    {"webp": "… 320w, … 640w, … 1280w", "jpg": "…"}. Пока фоновая задача
+    не построила производные (флаг <поле>_derivatives модели), — None:
+    клиент показывает оригинал.
+    """
+
+    def to_representation(self, value):
+        if not value or not getattr(
+            value.instance, ready_field(value.field.name)
+        ):
+            return None
+        request = self.context.get("request")
+        build_url = request.build_absolute_uri if request else str
+        return {
+            extension: srcset(value.name, build_url, extension, value.storage)
+            for extension in FORMATS
+        }
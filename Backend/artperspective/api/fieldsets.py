@@ -0,0 +1,83 @@
+"""
+Компактные списки и ?fields= для viewset'ов картин.
+
+Список отдаётся list_serializer_class (карточки галереи), карточка —
+serializer_class. ?fields=id,title,... выбирает поля из полного
+serializer_class и в списке, и в карточке. В обоих случаях SELECT
+сужается .only() до колонок выбранных полей (serializer.COLUMNS), а
+select_related художника и prefetch тегов снимаются, если их поля не
+нужны.
+"""
+from functools import cached_property
+
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    list_serializer_class = None
+    fields_query_param = "fields"
+
+    @cached_property
+    def requested_fields(self):
+        """Поля из ?fields= или None, если параметра нет."""
+        raw = self.request.query_params.get(self.fields_query_param)
+        if raw is None:
+            return None
+        fields = [name.strip() for name in raw.split(",") if name.strip()]
+        available = self.serializer_class().fields
+        unknown = [name for name in fields if name not in available]
+        if not fields or unknown:
+            raise ValidationError(
+                {
+                    self.fields_query_param: (
+                        f"Неизвестные поля: {', '.join(unknown)}. "
+                        f"Доступны: {', '.join(available)}."
+                    )
+                }
+            )
+        return fields
+
+    def get_rendered_fields(self):
+        """Поля, которые попадут в ответ, или None — все поля."""
+        fields = self.requested_fields
+        if fields is None and self.action == "list":
+            serializer_class = self.list_serializer_class
+            if serializer_class is not None:
+                fields = serializer_class.Meta.fields
+        return fields
+
+    def get_serializer_class(self):
+        if (
+            self.action == "list"
+            and self.list_serializer_class is not None
+            and self.requested_fields is None
+        ):
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.requested_fields is not None:
+            kwargs.setdefault("fields", self.requested_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def narrow(self, queryset):
+        """Сужает выборку под поля ответа; без ограничений — как есть."""
+        fields = self.get_rendered_fields()
+        if fields is None:
+            return queryset
+        columns = self.serializer_class.columns(fields)
+        # Ключ сортировки нужен пагинации для курсора следующей страницы.
+        get_ordering = getattr(self.paginator, "get_ordering", None)
+        if get_ordering is not None:
+            model_fields = {
+                field.name for field in queryset.model._meta.concrete_fields
+            }
+            for name in get_ordering(self.request, queryset):
+                name = name.lstrip("-")
+                if name in model_fields:
+                    columns.add(name)
+        if "artist__name" not in columns:
+            queryset = queryset.select_related(None)
+        if "tags" not in fields:
+            queryset = queryset.prefetch_related(None)
+        return queryset.only(*columns)
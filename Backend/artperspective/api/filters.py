@@ -0,0 +1,80 @@
+from django import forms
+from django.db.models import Count
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+
+from paintings import search
+from paintings.models import Painting, PaintingTag
+
+
+class PaintingSearchFilter(filters.SearchFilter):
+    """
+    ?search= по полнотекстовому индексу картин в Postgres. На других
+    базах (SQLite в разработке) — обычный SearchFilter по search_fields.
+    Триграммный поиск оставляет во view.search_fallback: он выполняется,
+    только если полнотекстовый ничего не нашёл, — без лишнего exists().
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not search.is_supported():
+            return super().filter_queryset(request, queryset, view)
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        view.search_fallback = search.fuzzy_search(queryset, terms)
+        return search.search(queryset, terms)
+
+
+class IdInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    """Список id через запятую: ?tags=1,2,3."""
+
+    field_class = forms.IntegerField
+
+
+class PaintingFilter(django_filters.FilterSet):
+    """
+    ?tags=1,2 — картины со всеми тегами (tags_match=all, по умолчанию)
+    или хотя бы с одним (tags_match=any). Теги отбираются подзапросом по
+    PaintingTag (индекс tag, painting), без JOIN и DISTINCT в выборке.
+    ?artist=1,2 — любой из художников; ?year_min= и ?year_max= — годы
+    включительно.
+    """
+
+    tags = IdInFilter(method="filter_tags")
+    tags_match = django_filters.ChoiceFilter(
+        choices=(("all", "all"), ("any", "any")), method="filter_match"
+    )
+    artist = IdInFilter(field_name="artist_id", lookup_expr="in")
+    year_min = django_filters.NumberFilter(
+        field_name="year", lookup_expr="gte"
+    )
+    year_max = django_filters.NumberFilter(
+        field_name="year", lookup_expr="lte"
+    )
+
+    class Meta:
+        model = Painting
+        fields = []
+
+    def filter_match(self, queryset, name, value):
+        # Учитывается в filter_tags.
+        return queryset
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = set(value)
+        if not tag_ids:
+            return queryset
+        links = PaintingTag.objects.filter(tag_id__in=tag_ids)
+        if self.form.cleaned_data.get("tags_match") != "any":
+            links = (
+                links.values("painting_id")
+                .annotate(matched=Count("tag_id"))
+                .filter(matched=len(tag_ids))
+            )
+        return queryset.filter(pk__in=links.values("painting_id"))
+
+
+def is_filtered(request):
+    """Сужают ли параметры запроса каталог (фильтры или поиск)."""
+    names = (*PaintingFilter.base_filters, PaintingSearchFilter.search_param)
+    return any(request.query_params.get(name) for name in names)
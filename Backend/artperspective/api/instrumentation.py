@@ -0,0 +1,294 @@
+"""
+Инструментирование запросов (включается INSTRUMENTATION=true).
+
+Для каждого запроса считаются число SQL-запросов, время в базе, время
+сериализации и повторяющиеся запросы (одинаковый SQL с точностью до
+параметров — признак N+1). Результат уходит в заголовок Server-Timing,
+в JSON-строку лога api.instrumentation и в гистограммы по эндпоинтам,
+которые отдаёт /metrics в текстовом формате Prometheus.
+
+SQL перехватывается execute_wrapper'ом на каждом соединении, а не через
+connection.queries, поэтому DEBUG не нужен и память не копится.
+Гистограммы живут в памяти процесса: каждый воркер gunicorn отдаёт свои.
+"""
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм: секунды и число запросов.
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+# Сколько повторяющихся запросов показывать в логе.
+DUPLICATES_LOGGED = 5
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.fingerprints = Counter()
+
+    def duplicates(self):
+        return [
+            {"sql": sql[:200], "count": count}
+            for sql, count in self.fingerprints.most_common(DUPLICATES_LOGGED)
+            if count > 1
+        ]
+
+
+def fingerprint(sql):
+    """SQL без параметров: списки IN (%s, %s, …) схлопываются в один."""
+    sql = re.sub(r"\s+", " ", sql)
+    return re.sub(r"IN \((?:%s, )*%s\)", "IN (...)", sql)
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+        metrics.fingerprints[fingerprint(sql)] += 1
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _timed(data):
+    """Обёртка свойства .data: считается только внешний вызов."""
+    getter = data.fget
+
+    def timed_data(self):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return getter(self)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return getter(self)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_time += time.perf_counter() - started
+
+    return property(timed_data)
+
+
+def install():
+    """Подключает перехват SQL и сериализации; вызывается из ApiConfig."""
+    connection_created.connect(_install_wrapper)
+    for serializer_class in (
+        serializers.Serializer,
+        serializers.ListSerializer,
+    ):
+        serializer_class.data = _timed(serializer_class.__dict__["data"])
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.total}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class Registry:
+    """Гистограммы по (эндпоинт, метод) и счётчики ответов по статусу."""
+
+    HISTOGRAMS = {
+        "artperspective_request_duration_seconds": (
+            "Время обработки запроса.",
+            DURATION_BUCKETS,
+        ),
+        "artperspective_db_duration_seconds": (
+            "Суммарное время SQL-запросов за запрос.",
+            DURATION_BUCKETS,
+        ),
+        "artperspective_serializer_duration_seconds": (
+            "Время сериализации ответа.",
+            DURATION_BUCKETS,
+        ),
+        "artperspective_db_queries": (
+            "Число SQL-запросов за запрос.",
+            QUERY_BUCKETS,
+        ),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {
+            name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+            for name, (_, buckets) in self.HISTOGRAMS.items()
+        }
+        self.responses = Counter()
+        self.duplicates = Counter()
+
+    def observe(self, endpoint, method, status, duration, metrics):
+        key = (endpoint, method)
+        values = {
+            "artperspective_request_duration_seconds": duration,
+            "artperspective_db_duration_seconds": metrics.db_time,
+            "artperspective_serializer_duration_seconds": (
+                metrics.serializer_time
+            ),
+            "artperspective_db_queries": metrics.queries,
+        }
+        duplicated = sum(
+            count - 1 for count in metrics.fingerprints.values() if count > 1
+        )
+        with self.lock:
+            for name, value in values.items():
+                self.histograms[name][key].observe(value)
+            self.responses[(endpoint, method, status)] += 1
+            self.duplicates[key] += duplicated
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (endpoint, method), histogram in sorted(
+                    self.histograms[name].items()
+                ):
+                    labels = f'endpoint="{endpoint}",method="{method}"'
+                    lines.extend(histogram.lines(name, labels))
+            name = "artperspective_responses_total"
+            lines.append(f"# HELP {name} Ответы по статусу.")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method, status), count in sorted(
+                self.responses.items()
+            ):
+                lines.append(
+                    f'{name}{{endpoint="{endpoint}",method="{method}",'
+                    f'status="{status}"}} {count}'
+                )
+            name = "artperspective_duplicate_queries_total"
+            lines.append(f"# HELP {name} Повторные одинаковые SQL-запросы.")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method), count in sorted(self.duplicates.items()):
+                lines.append(
+                    f'{name}{{endpoint="{endpoint}",method="{method}"}} '
+                    f"{count}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class InstrumentationMiddleware:
+    """Должен стоять первым в MIDDLEWARE, чтобы видеть весь запрос."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        endpoint = match.view_name if match else "unmatched"
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={metrics.db_time * 1000:.1f};'
+                f'desc="{metrics.queries} queries"',
+                f"serialize;dur={metrics.serializer_time * 1000:.1f}",
+                f"total;dur={duration * 1000:.1f}",
+            ]
+        )
+        registry.observe(
+            endpoint, request.method, response.status_code, duration, metrics
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "endpoint": endpoint,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round(duration * 1000, 1),
+                    "db_ms": round(metrics.db_time * 1000, 1),
+                    "serializer_ms": round(metrics.serializer_time * 1000, 1),
+                    "queries": metrics.queries,
+                    "duplicates": metrics.duplicates(),
+                },
+                ensure_ascii=False,
+            )
+        )
+        return response
+
+
+def metrics_view(request):
+    """
+    GET /metrics — гистограммы в формате Prometheus. Nginx этот путь не
+    проксирует, так что он доступен только из внутренней сети.
+    """
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,122 @@
+import json
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.benchmark import SCENARIOS, Catalogue, run, summarize
+from paintings.models import Artist, Painting
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет сценарии API (лента, поиск, похожие, рекомендации, "
+        "художники, избранное) в процессе и печатает пропускную "
+        "способность, p50/p95/p99 задержки и число SQL-запросов. Работает "
+        "с той базой, что задана в настройках (SQLite или Postgres); "
+        "данные — manage.py generate_catalogue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(SCENARIOS),
+            dest="scenarios",
+            help="Сценарий; можно указать несколько раз (по умолчанию все).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Повторов каждого сценария.",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=2, help="Повторов для прогрева."
+        )
+        parser.add_argument(
+            "--user",
+            help="Имя пользователя (по умолчанию — с самым большим "
+            "избранным).",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--output", help="Записать результаты в JSON для сравнения."
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        painting_ids = list(Painting.active.values_list("pk", flat=True))
+        if not painting_ids:
+            raise CommandError("Каталог пуст: запустите generate_catalogue.")
+        rng = random.Random(options["seed"])
+        titles = Painting.objects.values_list("title", flat=True)[:1000]
+        catalogue = Catalogue(
+            painting_ids=painting_ids,
+            artist_ids=list(Artist.objects.values_list("pk", flat=True)),
+            words=sorted(
+                {word for title in titles for word in title.split()}
+            ),
+            favorite_ids=set(
+                user.favorite_set.values_list("painting_id", flat=True)
+            ),
+            rng=rng,
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        results = {}
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts):
+            for name in options["scenarios"] or SCENARIOS:
+                scenario = SCENARIOS[name]
+                run(scenario, client, catalogue, options["warmup"])
+                samples, elapsed = run(
+                    scenario, client, catalogue, options["iterations"]
+                )
+                results[name] = summary = summarize(samples, elapsed)
+                self.stdout.write(
+                    f"{name:<16} n={summary['requests']:<5} "
+                    f"ошибок={summary['errors']:<3} "
+                    f"{summary['rps']:7.1f} req/s "
+                    f"p50={summary['p50']:7.1f}мс "
+                    f"p95={summary['p95']:7.1f}мс "
+                    f"p99={summary['p99']:7.1f}мс "
+                    f"SQL={summary['queries_avg']:.1f}"
+                    f"/{summary['queries_max']}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(
+                    {
+                        "paintings": len(painting_ids),
+                        "database": settings.DATABASES["default"]["ENGINE"],
+                        "results": results,
+                    },
+                    output,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+    def get_user(self, username):
+        User = get_user_model()
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"Нет пользователя {username}.")
+        user = (
+            User.objects.annotate(favorites=Count("favorite"))
+            .order_by("-favorites", "pk")
+            .first()
+        )
+        if user is None:
+            raise CommandError(
+                "Нет пользователей: запустите generate_catalogue."
+            )
+        return user
@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.compression import ENCODINGS, compress
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import PaintingListSerializer
+from paintings.models import Painting
+
+
+def measure(func, iterations):
+    """Медиана времени вызова в миллисекундах и последний результат."""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+class Command(BaseCommand):
+    help = (
+        "Микробенчмарк ответа со списком картин: сериализация "
+        "PaintingListSerializer, рендеринг stdlib json и orjson, сжатие "
+        "gzip/brotli. Печатает медианное время и пропускную способность."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--paintings",
+            type=int,
+            default=1000,
+            help="Сколько картин в списке.",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=20, help="Повторов замера."
+        )
+
+    def handle(self, *args, **options):
+        rows = list(
+            Painting.active.for_listing(None)[: options["paintings"]]
+        )
+        if not rows:
+            raise CommandError("Каталог пуст: запустите generate_catalogue.")
+        iterations = options["iterations"]
+        request = Request(APIRequestFactory().get("/api/paintings/"))
+
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts):
+            elapsed, data = measure(
+                lambda: PaintingListSerializer(
+                    rows, many=True, context={"request": request}
+                ).data,
+                iterations,
+            )
+        self.report(f"serializer ({len(rows)} картин)", elapsed, None)
+
+        renderers = [("json", JSONRenderer())]
+        if orjson is not None:
+            renderers.append(("orjson", FastJSONRenderer()))
+        else:
+            self.stdout.write("orjson не установлен — только stdlib json.")
+        for name, renderer in renderers:
+            elapsed, content = measure(
+                lambda: renderer.render(data), iterations
+            )
+            self.report(f"render {name}", elapsed, len(content))
+
+        for encoding in ENCODINGS:
+            elapsed, compressed = measure(
+                lambda: compress(content, encoding), iterations
+            )
+            self.report(
+                f"{encoding} ({len(compressed) / len(content):.0%})",
+                elapsed,
+                len(content),
+                size=len(compressed),
+            )
+
+    def report(self, name, elapsed, processed, size=None):
+        line = f"{name:<28} {elapsed:8.2f} мс"
+        if processed:
+            line += f" {processed / elapsed / 1000:8.1f} МБ/с"
+            line += f" {size or processed:>10} байт"
+        self.stdout.write(line)
@@ -0,0 +1,164 @@
+import json
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from api.benchmark import percentile
+from paintings import search
+from paintings.models import Favorite, Painting, Tags
+from paintings.utils import similar_to
+
+# Размер страницы, которую читает каждый запрос.
+PAGE = 20
+
+
+def similar_before(painting):
+    """Похожие картины до индекса: подсчёт общих тегов по всему каталогу."""
+    tag_ids = painting.tags.values_list("id", flat=True)
+    return (
+        Painting.objects.with_related()
+        .exclude(pk=painting.pk)
+        .annotate(shared_tags=Count("tags", filter=Q(tags__in=tag_ids)))
+        .distinct()
+        .order_by("-shared_tags", "title")
+    )
+
+
+def similar_after(painting):
+    return similar_to(painting)
+
+
+def recommendations_before(user_id):
+    """Рекомендации до предрасчёта: общие теги с избранным по каталогу."""
+    liked_tag_ids = Tags.objects.filter(
+        paintings__favorite__user_id=user_id
+    ).values_list("id", flat=True)
+    return (
+        Painting.objects.with_related()
+        .annotate(
+            shared_tags=Count("tags", filter=Q(tags__in=liked_tag_ids))
+        )
+        .order_by("-shared_tags", "title")
+    )
+
+
+def recommendations_after(user_id):
+    return (
+        Painting.active.with_related()
+        .filter(recommendations__user_id=user_id)
+        .order_by("-recommendations__score", "id")
+    )
+
+
+def search_before(word):
+    """Поиск до GIN-индекса: SearchFilter, ILIKE по названию и художнику."""
+    return Painting.objects.with_related().filter(
+        Q(title__icontains=word) | Q(artist__name__icontains=word)
+    )
+
+
+def search_after(word):
+    return search.search(Painting.objects.with_related(), [word])
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает запросы до и после предрасчётов: похожие картины "
+        "(индекс PaintingSimilarity), рекомендации (таблица "
+        "Recommendation) и поиск (GIN-индекс search_vector, только "
+        "Postgres). Каждый запрос читает первую страницу; печатаются "
+        "p50/p95 в миллисекундах. Данные — manage.py generate_catalogue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=30,
+            help="Повторов каждого запроса.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--output", help="Записать результаты в JSON для сравнения."
+        )
+
+    def handle(self, *args, **options):
+        painting_ids = list(Painting.active.values_list("pk", flat=True))
+        if not painting_ids:
+            raise CommandError("Каталог пуст: запустите generate_catalogue.")
+        rng = random.Random(options["seed"])
+        user_ids = list(
+            Favorite.objects.values_list("user_id", flat=True).distinct()
+        )
+        titles = Painting.objects.values_list("title", flat=True)[:1000]
+        words = sorted({word for title in titles for word in title.split()})
+
+        cases = {
+            "similar": (
+                similar_before,
+                similar_after,
+                lambda: Painting.objects.get(pk=rng.choice(painting_ids)),
+            ),
+            "recommendations": (
+                recommendations_before,
+                recommendations_after,
+                lambda: rng.choice(user_ids),
+            ),
+            "search": (
+                search_before,
+                search_after,
+                lambda: rng.choice(words),
+            ),
+        }
+        if not user_ids:
+            del cases["recommendations"]
+        if not search.is_supported():
+            # Вне Postgres поиск и так остаётся SearchFilter.
+            del cases["search"]
+
+        results = {}
+        for name, (before, after, argument) in cases.items():
+            arguments = [argument() for _ in range(options["iterations"])]
+            results[name] = {
+                "before": self.measure(before, arguments),
+                "after": self.measure(after, arguments),
+            }
+            self.stdout.write(
+                f"{name:<16} "
+                + " ".join(
+                    f"{label}: p50={summary['p50']:8.1f}мс "
+                    f"p95={summary['p95']:8.1f}мс"
+                    for label, summary in results[name].items()
+                )
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(
+                    {
+                        "paintings": len(painting_ids),
+                        "database": settings.DATABASES["default"]["ENGINE"],
+                        "results": results,
+                    },
+                    output,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+    def measure(self, build, arguments):
+        # Первый прогон прогревает кеш страниц базы.
+        list(build(arguments[0])[:PAGE])
+        latencies = []
+        for argument in arguments:
+            started = time.perf_counter()
+            list(build(argument)[:PAGE])
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        return {
+            "p50": statistics.median(latencies),
+            "p95": percentile(latencies, 0.95),
+        }
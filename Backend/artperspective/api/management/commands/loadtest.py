@@ -0,0 +1,101 @@
+import itertools
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+from api.benchmark import percentile
+
+DEFAULT_PATHS = [
+    "/api/paintings/",
+    "/api/artists/",
+    "/api/tags/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагружает запущенный сервер GET-запросами из пула потоков и "
+        "печатает запросы в секунду и перцентили задержки. Запустите один "
+        "раз против SERVER_MODE=wsgi и раз против SERVER_MODE=asgi с "
+        "одинаковым WEB_CONCURRENCY, чтобы сравнить режимы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8080",
+            help="Адрес сервера.",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Путь для запросов; можно указать несколько раз.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=1000, help="Всего запросов."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Число одновременных клиентов.",
+        )
+        parser.add_argument(
+            "--token", help="JWT access-токен (запросы в обход кеша API)."
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Добавлять уникальный параметр, чтобы не попадать в кеш.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or DEFAULT_PATHS
+        headers = {"Accept": "application/json"}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+        counter = itertools.count()
+
+        def fetch(path):
+            url = options["base_url"].rstrip("/") + path
+            if options["no_cache"]:
+                separator = "&" if "?" in url else "?"
+                url += f"{separator}_={next(counter)}"
+            started = time.perf_counter()
+            try:
+                with urlopen(Request(url, headers=headers)) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (HTTPError, URLError):
+                ok = False
+            return path, time.perf_counter() - started, ok
+
+        jobs = itertools.islice(itertools.cycle(paths), options["requests"])
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            results = list(pool.map(fetch, jobs))
+        elapsed = time.perf_counter() - started
+
+        for path in paths + [None]:
+            rows = [row for row in results if path in (None, row[0])]
+            latencies = sorted(latency * 1000 for _, latency, _ in rows)
+            errors = sum(not ok for _, _, ok in rows)
+            self.stdout.write(
+                f"{path or 'всего':<32} n={len(rows):<6} "
+                f"ошибок={errors:<4} "
+                f"p50={statistics.median(latencies):7.1f}мс "
+                f"p95={percentile(latencies, 0.95):7.1f}мс "
+                f"p99={percentile(latencies, 0.99):7.1f}мс "
+                f"max={latencies[-1]:7.1f}мс"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(results) / elapsed:.1f} запросов/с "
+                f"за {elapsed:.1f} с, клиентов: {options['concurrency']}."
+            )
+        )
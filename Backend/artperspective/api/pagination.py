@@ -0,0 +1,173 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу: курсор хранит значения полей сортировки последней
+    строки страницы, следующая страница — это WHERE по этим значениям,
+    поэтому страница N стоит столько же, сколько первая. Последнее поле
+    ordering должно быть уникальным.
+    """
+
+    ordering = ("-created_at", "-id")
+    # Другие сортировки, доступные как ?ordering=<ключ>.
+    orderings = {}
+    ordering_query_param = "ordering"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset)
+        position = self.decode_cursor(request, queryset)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        page = list(queryset[: self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[: self.page_size]
+        return self.page
+
+    def after(self, position):
+        """Условие «строго после position» для составного ключа."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def get_ordering(self, request, queryset):
+        name = request.query_params.get(self.ordering_query_param)
+        return self.orderings.get(name, self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request, queryset):
+        """
+        Позиция из курсора, приведённая к типам полей сортировки: курсор
+        приходит от клиента, и без проверки мусор в нём дошёл бы до
+        .filter() и ответа 500.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(b64decode(encoded.encode("ascii")))
+            if (
+                not isinstance(position, list)
+                or len(position) != len(self.ordering)
+            ):
+                raise ValueError(position)
+            return [
+                self.to_python(queryset, field, value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, BinasciiError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, queryset, field, value):
+        if value is None or isinstance(value, (bool, dict, list)):
+            raise ValueError(value)
+        name = field.lstrip("-")
+        # Сортировка бывает и по аннотации (similarity, score).
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            model_field = annotation.output_field
+        else:
+            model_field = queryset.model._meta.get_field(name)
+        return model_field.to_python(value)
+
+    def encode_cursor(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            # isoformat() сохраняет микросекунды, без них ключ неточен.
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            position.append(value)
+        encoded = b64encode(json.dumps(position).encode("utf-8")).decode(
+            "ascii"
+        )
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded,
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class PaintingPagination(KeysetPagination):
+    # Популярность — по денормализованному счётчику и индексу
+    # painting_popular_idx, без COUNT по избранному.
+    orderings = {
+        "-favorites_count": ("-favorites_count", "-id"),
+        "-year": ("-year", "-id"),
+    }
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = super().paginate_queryset(queryset, request, view)
+        fallback = getattr(view, "search_fallback", None)
+        if not page and fallback is not None:
+            # Полнотекстовый поиск пуст — страница триграммного
+            # (PaintingSearchFilter). Порядок тот же, поэтому курсор
+            # следующей страницы снова попадёт сюда.
+            page = super().paginate_queryset(fallback, request, view)
+        return page
+
+
+class ArtistPagination(KeysetPagination):
+    ordering = ("name", "id")
+
+
+class SimilarPaintingPagination(KeysetPagination):
+    ordering = ("-similarity", "id")
+
+
+class RecommendationPagination(KeysetPagination):
+    score_ordering = ("-recommendation_score", "id")
+
+    def get_ordering(self, request, queryset):
+        # Без предрассчитанных рекомендаций (нет аннотации score) —
+        # свежие картины по индексу painting_created_idx.
+        if "recommendation_score" in queryset.query.annotations:
+            return self.score_ordering
+        return super().get_ordering(request, queryset)
@@ -0,0 +1,56 @@
+"""
+JSON-рендерер и парсер API на orjson.
+
+orjson — необязательная зависимость: без него оба класса ведут себя как
+стандартные JSONRenderer/JSONParser DRF. Вывод совпадает со
+стандартным: даты, Decimal, ленивые строки и прочие типы, которых
+orjson не знает, форматирует тот же DRF JSONEncoder. С отступами
+(?format=json; indent=4, browsable API) рендерит stdlib json — orjson
+умеет только отступ в два пробела.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Даты отдаются в default, чтобы формат совпал с DRF, а не с orjson.
+ORJSON_OPTIONS = (
+    (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    if orjson
+    else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data, default=JSONEncoder().default, option=ORJSON_OPTIONS
+        )
+        # Как и JSONRenderer: U+2028/U+2029 экранируются для JS.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -1,23 +1,30 @@
 from collections import defaultdict
 
+from django import forms
 from django.contrib.auth import get_user_model
 from djoser.serializers import UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
-
+from api.fields import SrcsetField
 from paintings.models import Artist, Painting, Favorite, Tags
 
 User = get_user_model()
 
 
 class ArtUserSerializer(UserSerializer):
-    avatar = Base64ImageField(required=False)
+    # Тип файла проверяется по сигнатуре; полное декодирование Pillow и
+    # производные делает фоновая задача paintings.tasks.process_image.
+    avatar = Base64ImageField(
+        required=False, _DjangoImageField=forms.FileField
+    )
+    avatar_srcset = SrcsetField(source="avatar")
 
     class Meta(UserSerializer.Meta):
         model = User
         fields = UserSerializer.Meta.fields + (
             "avatar",
+            "avatar_srcset",
             "first_name",
             "last_name",
         )
@@ -32,13 +39,54 @@ class PaintingSerializer(serializers.ModelSerializer):
         source="artist", read_only=True
     )
     is_favorite = serializers.SerializerMethodField()
+    image_srcset = SrcsetField(source="image")
+
+    # Какие колонки картины читает поле: по ним список и ?fields=
+    # сужают SELECT (.only()). Теги приходят из prefetch, is_favorite —
+    # из аннотации, колонок у них нет.
+    COLUMNS = {
+        "id": ("id",),
+        "title": ("title",),
+        "artist": ("artist_id", "artist__name"),
+        "artist_id": ("artist_id",),
+        "year": ("year",),
+        "image": ("image",),
+        "image_srcset": ("image", "image_derivatives"),
+        "description": ("description",),
+        "created_at": ("created_at",),
+        "updated_at": ("updated_at",),
+        "archive": ("archive",),
+        "favorites_count": ("favorites_count",),
+    }
 
     class Meta:
         model = Painting
-        fields = "__all__"
-        read_only_fields = ["id", "created_at", "updated_at"]
+        exclude = ["search_vector"]
+        read_only_fields = [
+            "id",
+            "created_at",
+            "updated_at",
+            "favorites_count",
+        ]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def columns(cls, fields):
+        """Колонки Painting для .only() под набор полей fields."""
+        columns = {"id"}
+        for name in fields:
+            columns.update(cls.COLUMNS.get(name, ()))
+        return columns
 
     def get_is_favorite(self, obj):
+        # Во вьюсетах флаг уже посчитан аннотацией with_favorites().
+        if hasattr(obj, "is_favorite"):
+            return obj.is_favorite
         request = self.context.get("request")
         if request is None or request.user.is_anonymous:
             return False
@@ -47,6 +95,28 @@ class PaintingSerializer(serializers.ModelSerializer):
         ).exists()
 
 
+class PaintingListSerializer(PaintingSerializer):
+    """
+    Карточка галереи в списках: без описания, дат и флага архива —
+    их отдаёт только карточка картины (retrieve).
+    """
+
+    class Meta:
+        model = Painting
+        fields = [
+            "id",
+            "title",
+            "artist",
+            "artist_id",
+            "year",
+            "image",
+            "image_srcset",
+            "tags",
+            "is_favorite",
+            "favorites_count",
+        ]
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     pass
 
@@ -56,25 +126,51 @@ class FavoriteSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class SimilarPaintingSerializer(PaintingSerializer):
-    shared_tags = serializers.IntegerField(read_only=True)
+class FavoriteBulkSerializer(serializers.Serializer):
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        default=list,
+        max_length=500,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        default=list,
+        max_length=500,
+    )
+
+    def validate(self, attrs):
+        if set(attrs["add"]) & set(attrs["remove"]):
+            raise serializers.ValidationError(
+                "Картина не может быть одновременно в add и remove."
+            )
+        return attrs
+
+
+class SimilarPaintingSerializer(PaintingListSerializer):
+    similarity = serializers.FloatField(read_only=True)
 
-    class Meta(PaintingSerializer.Meta):
-        pass
+    class Meta(PaintingListSerializer.Meta):
+        fields = PaintingListSerializer.Meta.fields + ["similarity"]
 
 
 class ArtistSerializer(serializers.ModelSerializer):
     paintings_by_year = serializers.SerializerMethodField()
+    image_srcset = SrcsetField(source="image")
+    background_srcset = SrcsetField(source="background")
 
     class Meta:
         model = Artist
         fields = "__all__"
 
     def get_paintings_by_year(self, obj):
-        paintings_set = obj.paintings.all().order_by("-year")
+        # Последние картины уже подгружены и отсортированы по году во
+        # вьюсете (latest_paintings), здесь только группировка.
+        paintings = PaintingListSerializer(
+            obj.latest_paintings, many=True, context=self.context
+        ).data
         grouped = defaultdict(list)
-        for painting in paintings_set:
-            grouped[painting.year].append(PaintingSerializer(painting).data)
+        for painting in paintings:
+            grouped[painting["year"]].append(painting)
         return grouped
 
 
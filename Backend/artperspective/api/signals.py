@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import bump_version
+from api.conditional import touch_favorites
+from paintings.models import Artist, Favorite, Painting, PaintingTag, Tags
+
+
+@receiver(post_save, sender=Painting)
+@receiver(post_delete, sender=Painting)
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+@receiver(post_save, sender=PaintingTag)
+@receiver(post_delete, sender=PaintingTag)
+@receiver(m2m_changed, sender=Painting.tags.through)
+def catalogue_changed(sender, **kwargs):
+    # После коммита: иначе параллельный запрос успеет закешировать
+    # старые данные под новой версией (и выдать с ними новый ETag).
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_favorites(instance.user_id)
@@ -0,0 +1,582 @@
+import json
+import tempfile
+from base64 import b64encode
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.cache import bump_version
+from paintings import search
+from paintings.facets import facet_counts
+from paintings.recommendations import rebuild_recommendations
+from paintings.similarity import rebuild_similarity
+from paintings.models import (
+    Artist,
+    Favorite,
+    Painting,
+    PaintingSimilarity,
+    Recommendation,
+    Tags,
+)
+
+
+class QueryCountTestCase(TestCase):
+    """
+    Число запросов эндпоинта не должно зависеть от числа строк: сначала
+    меряем ответ на маленьких данных, затем добавляем строки и требуем
+    столько же запросов.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="viewer", password="viewer"
+        )
+        cls.artist = Artist.objects.create(name="Artist", bio="Bio")
+        cls.tags = [Tags.objects.create(name=f"tag-{i}") for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def create_paintings(self, count, artist=None, tags=None):
+        paintings = [
+            Painting.objects.create(
+                title=f"Painting {index}",
+                artist=artist or self.artist,
+                year=1900 + index,
+                description="",
+            )
+            for index in range(count)
+        ]
+        for painting in paintings:
+            painting.tags.set(self.tags if tags is None else tags)
+        return paintings
+
+    def count_queries(self, url):
+        # Ответы анонимам кешируются: каждый замер — с пустым кешем.
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context)
+
+    def assertConstantQueries(self, url, grow):
+        baseline = self.count_queries(url)
+        grow()
+        cache.clear()
+        with self.assertNumQueries(baseline):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+class PaintingQueryCountTests(QueryCountTestCase):
+    def test_list_anonymous(self):
+        self.create_paintings(1)
+        response = self.assertConstantQueries(
+            "/api/paintings/?page_size=50",
+            lambda: self.create_paintings(20),
+        )
+        self.assertEqual(len(response.data["results"]), 21)
+
+    def test_list_authenticated(self):
+        self.client.force_authenticate(self.user)
+        painting = self.create_paintings(1)[0]
+        Favorite.objects.create(user=self.user, painting=painting)
+
+        def grow():
+            for painting in self.create_paintings(20):
+                Favorite.objects.create(user=self.user, painting=painting)
+
+        response = self.assertConstantQueries(
+            "/api/paintings/?page_size=50", grow
+        )
+        self.assertTrue(
+            all(row["is_favorite"] for row in response.data["results"])
+        )
+
+    def test_detail(self):
+        painting = self.create_paintings(1, tags=self.tags[:1])[0]
+        url = f"/api/paintings/{painting.pk}/"
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                self.client.force_authenticate(user)
+                self.assertConstantQueries(
+                    url, lambda: painting.tags.set(self.tags)
+                )
+                painting.tags.set(self.tags[:1])
+
+
+class FavoriteQueryCountTests(QueryCountTestCase):
+    def test_list(self):
+        self.client.force_authenticate(self.user)
+
+        def favorite(count):
+            for painting in self.create_paintings(count):
+                Favorite.objects.create(user=self.user, painting=painting)
+
+        favorite(1)
+        response = self.assertConstantQueries(
+            "/api/favorites/?page_size=50", lambda: favorite(20)
+        )
+        self.assertEqual(len(response.data["results"]), 21)
+
+
+class FixtureQueryCountTests(QueryCountTestCase):
+    """
+    Каталог из fixture.json, размноженный фабрикой в SCALE раз: число
+    запросов каждого эндпоинта на обоих размерах одинаково.
+    """
+
+    SCALE = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "loaddata",
+            settings.BASE_DIR / "fixture.json",
+            exclude=["admin", "auth", "contenttypes", "sessions"],
+            verbosity=0,
+        )
+        cls.user = get_user_model().objects.get(username="alex")
+        cls.originals = list(Painting.objects.prefetch_related("tags"))
+        for painting in cls.originals[:3]:
+            Favorite.objects.create(user=cls.user, painting=painting)
+        rebuild_similarity()
+        rebuild_recommendations()
+
+    def scale(self):
+        favorites = set(
+            Favorite.objects.filter(user=self.user).values_list(
+                "painting_id", flat=True
+            )
+        )
+        for copy in range(1, self.SCALE):
+            for painting in self.originals:
+                clone = Painting.objects.create(
+                    title=f"{painting.title} {copy}",
+                    artist_id=painting.artist_id,
+                    year=painting.year,
+                    image=painting.image.name,
+                    description=painting.description,
+                )
+                clone.tags.set(painting.tags.all())
+                if painting.pk in favorites:
+                    Favorite.objects.create(user=self.user, painting=clone)
+        rebuild_similarity()
+        rebuild_recommendations()
+
+    def test_endpoints(self):
+        painting = self.originals[0]
+        tag = painting.tags.all()[0]
+        urls = [
+            "/api/paintings/?page_size=100",
+            f"/api/paintings/?page_size=100&tags={tag.pk}",
+            f"/api/paintings/{painting.pk}/",
+            f"/api/paintings/{painting.pk}/similar/?page_size=100",
+            "/api/paintings/facets/",
+            f"/api/artists/{painting.artist_id}/",
+            "/api/artists/",
+            "/api/tags/",
+        ]
+        private = [
+            "/api/favorites/?page_size=100",
+            "/api/recommendations/?page_size=100",
+        ]
+        requests = [(None, url) for url in urls] + [
+            (self.user, url) for url in urls + private
+        ]
+        baseline = {}
+        for user, url in requests:
+            self.client.force_authenticate(user)
+            baseline[user, url] = self.count_queries(url)
+        self.scale()
+        self.assertEqual(
+            Painting.objects.count(), len(self.originals) * self.SCALE
+        )
+        for user, url in requests:
+            with self.subTest(user=user, url=url):
+                self.client.force_authenticate(user)
+                self.assertEqual(self.count_queries(url), baseline[user, url])
+
+
+class FavoriteBulkTests(QueryCountTestCase):
+    def test_remove(self):
+        self.client.force_authenticate(self.user)
+        paintings = self.create_paintings(3)
+        for painting in paintings:
+            Favorite.objects.create(user=self.user, painting=painting)
+        removed = [painting.pk for painting in paintings[:2]]
+        with patch(
+            "paintings.recommendations.refresh_recommendations"
+        ) as refresh, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/favorites/bulk/", {"remove": removed}, format="json"
+            )
+        self.assertEqual(response.data["removed"], removed)
+        refresh.assert_called_once_with(self.user.pk)
+        counts = dict(
+            Painting.objects.values_list("pk", "favorites_count")
+        )
+        self.assertEqual(
+            [counts[painting.pk] for painting in paintings], [0, 0, 1]
+        )
+
+
+    def test_add(self):
+        self.client.force_authenticate(self.user)
+        paintings = self.create_paintings(3)
+        Favorite.objects.create(user=self.user, painting=paintings[0])
+        with patch(
+            "paintings.recommendations.refresh_recommendations"
+        ) as refresh, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/favorites/bulk/",
+                {"add": [painting.pk for painting in paintings]},
+                format="json",
+            )
+        self.assertEqual(
+            response.data["added"], [painting.pk for painting in paintings[1:]]
+        )
+        refresh.assert_called_once_with(self.user.pk)
+        counts = dict(
+            Painting.objects.values_list("pk", "favorites_count")
+        )
+        self.assertEqual(
+            [counts[painting.pk] for painting in paintings], [1, 1, 1]
+        )
+
+    def test_insert_new_skips_existing(self):
+        # Строку успел вставить параллельный запрос: она не считается.
+        first, second = self.create_paintings(2)
+        Favorite.objects.create(user=self.user, painting=first)
+        self.assertEqual(
+            Favorite.objects.insert_new(self.user.pk, [first.pk, second.pk]),
+            [second.pk],
+        )
+
+
+class RecommendationQueryCountTests(QueryCountTestCase):
+    def recommend(self, count):
+        for painting in self.create_paintings(count):
+            Recommendation.objects.create(
+                user=self.user, painting=painting, score=1.0
+            )
+
+    def test_list(self):
+        self.client.force_authenticate(self.user)
+        self.recommend(1)
+        response = self.assertConstantQueries(
+            "/api/recommendations/?page_size=50", lambda: self.recommend(20)
+        )
+        self.assertEqual(len(response.data["results"]), 21)
+
+    def test_list_without_recommendations(self):
+        self.client.force_authenticate(self.user)
+        self.create_paintings(1)
+        self.assertConstantQueries(
+            "/api/recommendations/?page_size=50",
+            lambda: self.create_paintings(20),
+        )
+
+    def test_newest_first_without_recommendations(self):
+        self.client.force_authenticate(self.user)
+        paintings = self.create_paintings(3)
+        response = self.client.get("/api/recommendations/?page_size=2")
+        ids = [row["id"] for row in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        ids += [row["id"] for row in response.data["results"]]
+        self.assertEqual(ids, [painting.pk for painting in paintings[::-1]])
+
+
+class SimilarQueryCountTests(QueryCountTestCase):
+    def test_similar(self):
+        painting = self.create_paintings(1)[0]
+
+        def neighbours(count):
+            for similar in self.create_paintings(count):
+                PaintingSimilarity.objects.create(
+                    painting=painting, similar=similar, score=0.5
+                )
+
+        neighbours(1)
+        url = f"/api/paintings/{painting.pk}/similar/?page_size=50"
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                self.client.force_authenticate(user)
+                self.assertConstantQueries(url, lambda: neighbours(10))
+
+
+class ArtistQueryCountTests(QueryCountTestCase):
+    def test_list(self):
+        other = Artist.objects.create(name="Other", bio="Bio")
+        for artist in (self.artist, other):
+            self.create_paintings(1, artist=artist)
+
+        def grow():
+            for artist in (self.artist, other):
+                self.create_paintings(15, artist=artist)
+            Artist.objects.create(name="Another", bio="Bio")
+
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                self.client.force_authenticate(user)
+                self.assertConstantQueries("/api/artists/", grow)
+
+    def test_detail(self):
+        self.create_paintings(1)
+        self.assertConstantQueries(
+            f"/api/artists/{self.artist.pk}/",
+            lambda: self.create_paintings(20),
+        )
+
+    def test_pages(self):
+        for name in ("Cézanne", "Bosch"):
+            Artist.objects.create(name=name, bio="Bio")
+        response = self.client.get("/api/artists/?page_size=2")
+        self.assertEqual(
+            [row["name"] for row in response.data["results"]],
+            ["Artist", "Bosch"],
+        )
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [row["name"] for row in response.data["results"]], ["Cézanne"]
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_paintings_limit(self):
+        self.create_paintings(25)
+        response = self.client.get(f"/api/artists/{self.artist.pk}/")
+        years = [
+            painting["year"]
+            for paintings in response.data["paintings_by_year"].values()
+            for painting in paintings
+        ]
+        # Самые поздние работы; остальные — страницами /paintings/.
+        self.assertEqual(years, list(range(1924, 1904, -1)))
+        response = self.client.get(
+            "/api/paintings/",
+            {"artist": self.artist.pk, "ordering": "-year", "page_size": 20},
+        )
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [row["year"] for row in response.data["results"]],
+            list(range(1904, 1899, -1)),
+        )
+
+
+class FacetTests(QueryCountTestCase):
+    url = "/api/paintings/facets/"
+
+    def setUp(self):
+        super().setUp()
+        self.other = Artist.objects.create(name="Other", bio="Bio")
+        self.create_paintings(3)
+        self.create_paintings(1, artist=self.other, tags=self.tags[:1])
+        archived = self.create_paintings(1)[0]
+        archived.archive = True
+        archived.save()
+
+    def facets(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_unfiltered(self):
+        data = self.facets(self.url, 1)
+        self.assertEqual(data["count"], 4)
+        self.assertEqual(
+            [(row["name"], row["count"]) for row in data["tags"]],
+            [("tag-0", 4), ("tag-1", 3), ("tag-2", 3)],
+        )
+        self.assertEqual(
+            [(row["name"], row["count"]) for row in data["artists"]],
+            [("Artist", 3), ("Other", 1)],
+        )
+        self.assertEqual(data["decades"], [{"decade": 1900, "count": 4}])
+        # Без фильтров ответ общий и второй раз берётся из кеша.
+        self.assertEqual(self.facets(self.url, 0), data)
+
+    def test_limit(self):
+        # На Postgres LIMIT внутри UNION, на SQLite — после запроса.
+        data = facet_counts(Painting.active.all(), limit=1)
+        self.assertEqual(data["count"], 4)
+        self.assertEqual([row["name"] for row in data["tags"]], ["tag-0"])
+        self.assertEqual(
+            [row["name"] for row in data["artists"]], ["Artist"]
+        )
+
+    def test_filtered(self):
+        url = f"{self.url}?artist={self.other.pk}"
+        for _ in range(2):
+            data = self.facets(url, 1)
+            self.assertEqual(data["count"], 1)
+            self.assertEqual(
+                [(row["name"], row["count"]) for row in data["tags"]],
+                [("tag-0", 1)],
+            )
+            self.assertEqual(
+                [row["id"] for row in data["artists"]], [self.other.pk]
+            )
+
+
+@skipUnless(search.is_supported(), "полнотекстовый поиск — только Postgres")
+class SearchTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        for title in ("Звёздная ночь", "Подсолнухи", "Water Lilies"):
+            Painting.objects.create(
+                title=title, artist=self.artist, year=1889, description=""
+            )
+
+    def search(self, text):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/paintings/", {"search": text})
+        self.assertEqual(response.status_code, 200)
+        titles = [row["title"] for row in response.data["results"]]
+        return titles, len(context)
+
+    def test_full_text(self):
+        # Стемминг russian: «ночи» находит «ночь».
+        titles, _ = self.search("ночи")
+        self.assertEqual(titles, ["Звёздная ночь"])
+
+    def test_prefix(self):
+        titles, queries = self.search("подсол")
+        self.assertEqual(titles, ["Подсолнухи"])
+        # Нашёл полнотекстовый поиск, без запроса триграмм.
+        self.assertEqual(queries, self.search("ночи")[1])
+
+    def test_trigram_fallback(self):
+        titles, found = self.search("lilies")
+        self.assertEqual(titles, ["Water Lilies"])
+        # Опечатка: полнотекстовая страница пуста, ещё один запрос —
+        # триграммы.
+        titles, fallback = self.search("Lilies Watr")
+        self.assertEqual(titles, ["Water Lilies"])
+        self.assertEqual(fallback, found + 1)
+
+
+class CursorTests(QueryCountTestCase):
+    def cursor(self, position):
+        return b64encode(json.dumps(position).encode()).decode()
+
+    def test_next_page(self):
+        self.create_paintings(3)
+        response = self.client.get("/api/paintings/?page_size=2")
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_invalid_cursor(self):
+        painting = self.create_paintings(1)[0]
+        similar = f"/api/paintings/{painting.pk}/similar/"
+        cursors = [
+            ("/api/paintings/", "not base64!"),
+            ("/api/paintings/", self.cursor({"a": 1})),
+            ("/api/paintings/", self.cursor([1])),
+            ("/api/paintings/", self.cursor(["abc", 1])),
+            ("/api/paintings/", self.cursor([{"a": 1}, 1])),
+            ("/api/paintings/", self.cursor([None, 1])),
+            ("/api/paintings/", self.cursor(["2025-01-01T00:00:00", "x"])),
+            (
+                "/api/paintings/?ordering=-favorites_count",
+                self.cursor([[1], 1]),
+            ),
+            (similar, self.cursor(["high", 1])),
+        ]
+        for url, cursor in cursors:
+            with self.subTest(url=url, cursor=cursor):
+                separator = "&" if "?" in url else "?"
+                response = self.client.get(f"{url}{separator}cursor={cursor}")
+                self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(QueryCountTestCase):
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified_without_queries(self):
+        painting = self.create_paintings(1)[0]
+        for url in ("/api/paintings/", f"/api/paintings/{painting.pk}/"):
+            for user in (None, self.user):
+                with self.subTest(url=url, user=user):
+                    self.client.force_authenticate(user)
+                    etag = self.client.get(url)["ETag"]
+                    with self.assertNumQueries(0):
+                        response = self.revalidate(url, etag)
+                    self.assertEqual(response.status_code, 304)
+
+    def test_catalogue_change(self):
+        painting = self.create_paintings(1)[0]
+        etag = self.client.get("/api/paintings/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            painting.title = "Renamed"
+            painting.save()
+        response = self.revalidate("/api/paintings/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["title"], "Renamed")
+
+    def test_favorite_change(self):
+        painting = self.create_paintings(1)[0]
+        url = f"/api/paintings/{painting.pk}/"
+        anonymous = self.client.get(url)["ETag"]
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"{url}favorite/")
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["is_favorite"])
+        # favorites_count изменился и для анонимов.
+        self.client.force_authenticate(None)
+        self.assertEqual(self.revalidate(url, anonymous).status_code, 200)
+
+
+class CacheInvalidationTests(QueryCountTestCase):
+    """
+    Версию кеша увеличивают и другие процессы (импорт, воркер задач):
+    «worker» — второй алиас того же хранилища, как у другого процесса.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory.name,
+        }
+        settings = override_settings(
+            CACHES={"default": backend, "worker": backend}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        super().setUp()
+
+    def test_bump_in_other_process(self):
+        painting = self.create_paintings(1)[0]
+        url = "/api/paintings/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        # Правка без сигналов, как у bulk-операций импорта.
+        Painting.objects.filter(pk=painting.pk).update(title="Renamed")
+        self.assertEqual(
+            self.client.get(url).data["results"][0]["title"], "Painting 0"
+        )
+        with override_settings(API_CACHE_ALIAS="worker"):
+            bump_version()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["title"], "Renamed")
@@ -2,6 +2,8 @@ from django.urls import path
 from rest_framework.routers import DefaultRouter
 from api.views import (
     ArtistListViewSet,
+    CacheStatsView,
+    CatalogueExportView,
     FavoriteListViewSet,
     PaintingViewSet,
     RecommendationViewSet,
@@ -20,5 +22,11 @@ router.register(
 
 
 urlpatterns = [
-    path("tags/", TagsListView.as_view(), name="tags")
+    path("tags/", TagsListView.as_view(), name="tags"),
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path(
+        "export/paintings/",
+        CatalogueExportView.as_view(),
+        name="export-paintings",
+    ),
 ] + router.urls
@@ -1,38 +1,67 @@
+from api.cache import CachedReadMixin, cached_value, stats
+from api.conditional import ConditionalGetMixin, touch_favorites
+from api.fieldsets import SparseFieldsetMixin
+from api.filters import PaintingFilter, PaintingSearchFilter, is_filtered
+from api.pagination import (
+    ArtistPagination,
+    PaintingPagination,
+    RecommendationPagination,
+    SimilarPaintingPagination,
+)
 from api.serializers import (
     ArtistSerializer,
+    FavoriteBulkSerializer,
     FavoriteSerializer,
+    PaintingListSerializer,
     PaintingSerializer,
     SimilarPaintingSerializer,
     TagSerializer,
 )
-from django.db.models import Count, Prefetch, Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from paintings.models import Artist, Favorite, Painting, Tags
+from paintings import counters, export, recommendations
+from paintings.facets import facet_counts
+from paintings.models import Artist, Favorite, Painting, Recommendation, Tags
 from paintings.utils import similar_to
 from rest_framework import filters, generics, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 
-class PaintingViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Painting.objects.filter(archive=False)
+class PaintingViewSet(
+    ConditionalGetMixin,
+    CachedReadMixin,
+    SparseFieldsetMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    queryset = Painting.active.all()
     serializer_class = PaintingSerializer
+    list_serializer_class = PaintingListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = PaintingPagination
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        PaintingSearchFilter,
     ]
-    filterset_fields = {
-        "tags": ["exact"],
-    }
+    filterset_class = PaintingFilter
 
     search_fields = ["title", "artist__name"]
-    queryset = Painting.objects.all()
+
+    def get_queryset(self):
+        return self.narrow(
+            super().get_queryset().for_listing(self.request.user)
+        )
 
     @action(
         detail=True, methods=["post"], permission_classes=[IsAuthenticated]
@@ -66,13 +95,37 @@ class PaintingViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    @action(detail=True, methods=["get"])
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+        GET /paintings/facets/ — число картин по тегам, художникам и
+        десятилетиям для тех же фильтров и поиска, что у списка. Без
+        фильтров ответ общий для всех и берётся из кеша.
+        """
+        if not is_filtered(request):
+            return Response(
+                cached_value(
+                    "facets", lambda: facet_counts(Painting.active.all())
+                )
+            )
+        facets = facet_counts(self.filter_queryset(Painting.active.all()))
+        fallback = getattr(self, "search_fallback", None)
+        if not facets["count"] and fallback is not None:
+            # Как у списка: пустой полнотекстовый поиск — триграммы.
+            facets = facet_counts(fallback)
+        return Response(facets)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        pagination_class=SimilarPaintingPagination,
+    )
     def similar(self, request, pk=None):
         """
         GET /paintings/{pk}/similar/ — список похожих картин.
         """
         painting = self.get_object()
-        qs = similar_to(painting)
+        qs = similar_to(painting).with_favorites(request.user)
         page = self.paginate_queryset(qs)
         serializer = SimilarPaintingSerializer(
             page if page is not None else qs,
@@ -84,51 +137,182 @@ class PaintingViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class FavoriteListViewSet(viewsets.ReadOnlyModelViewSet):
+class FavoriteListViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = PaintingSerializer
+    list_serializer_class = PaintingListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PaintingPagination
 
     def get_queryset(self):
-        return Painting.objects.filter(favorite__user=self.request.user)
+        user = self.request.user
+        return self.narrow(
+            Painting.active.filter(favorite__user=user).for_listing(user)
+        )
 
+    @action(detail=False, methods=["get"])
+    def ids(self, request):
+        """
+        GET /favorites/ids/ — id всех картин в избранном одним запросом,
+        чтобы отметить галерею без проверки каждой картины.
+        """
+        ids = (
+            Favorite.objects.filter(user=request.user)
+            .order_by("painting_id")
+            .values_list("painting_id", flat=True)
+        )
+        return Response({"ids": list(ids)})
 
-class ArtistListViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Artist.objects.prefetch_related(
-        Prefetch("paintings", queryset=Painting.objects.order_by("-year"))
-    )
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        POST /favorites/bulk/ {"add": [id, ...], "remove": [id, ...]} —
+        добавить и убрать несколько картин одной транзакцией. Отвечает
+        id, которые действительно добавились и убрались.
+        """
+        serializer = FavoriteBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+        with transaction.atomic():
+            added = self.add_favorites(user, serializer.validated_data["add"])
+            removed = self.remove_favorites(
+                user, serializer.validated_data["remove"]
+            )
+            if added or removed:
+                recommendations.schedule_refresh(user.pk)
+                touch_favorites(user.pk)
+        return Response({"added": added, "removed": removed})
+
+    def add_favorites(self, user, painting_ids):
+        new_ids = (
+            Painting.active.filter(pk__in=painting_ids)
+            .exclude(favorite__user=user)
+            .values_list("pk", flat=True)
+        )
+        # Считаем только реально вставленные строки: картину мог
+        # параллельно добавить другой запрос (его посчитал post_save).
+        added_ids = Favorite.objects.insert_new(user.pk, list(new_ids))
+        counters.change_favorites(added_ids, 1)
+        return added_ids
+
+    def remove_favorites(self, user, painting_ids):
+        favorites = Favorite.objects.filter(
+            user=user, painting_id__in=painting_ids
+        )
+        removed_ids = sorted(
+            favorites.select_for_update().values_list(
+                "painting_id", flat=True
+            )
+        )
+        # Один DELETE без post_delete на каждую строку (у Favorite нет
+        # зависимых моделей): счётчики — одним UPDATE, рекомендации и
+        # отметка избранного — в bulk().
+        favorites._raw_delete(favorites.db)
+        counters.change_favorites(removed_ids, -1)
+        return removed_ids
+
+
+class ArtistListViewSet(
+    ConditionalGetMixin, CachedReadMixin, viewsets.ReadOnlyModelViewSet
+):
     serializer_class = ArtistSerializer
+    pagination_class = ArtistPagination
+    # Вложенных картин у художника не больше этого; все работы —
+    # страницами /paintings/?artist=<id>&ordering=-year.
+    paintings_limit = 20
+
+    def get_queryset(self):
+        # Художник вложенных картин берётся из prefetch (это сам объект
+        # Artist), поэтому его имя не читается заново.
+        columns = PaintingListSerializer.columns(
+            PaintingListSerializer.Meta.fields
+        ) - {"artist__name"}
+        paintings = (
+            Painting.active.order_by("-year", "-id")
+            .prefetch_related("tags")
+            .only(*columns)
+            .with_favorites(self.request.user)
+        )
+        return Artist.objects.prefetch_related(
+            Prefetch(
+                "paintings",
+                queryset=paintings[: self.paintings_limit],
+                to_attr="latest_paintings",
+            )
+        )
 
 
-class TagsListView(generics.ListAPIView):
+class TagsListView(CachedReadMixin, generics.ListAPIView):
     serializer_class = TagSerializer
     queryset = Tags.objects.all()
+    # ?ordering=-paintings_count — по популярности (индекс tag_popular_idx).
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ["name", "paintings_count"]
 
 
-class RecommendationViewSet(viewsets.ReadOnlyModelViewSet):
+class RecommendationViewSet(
+    SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet
+):
     serializer_class = PaintingSerializer
+    list_serializer_class = PaintingListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RecommendationPagination
     filter_backends = [
         DjangoFilterBackend,
     ]
-    filterset_fields = {
-        "tags": ["exact"],
-    }
+    filterset_class = PaintingFilter
 
     def get_queryset(self):
+        """
+        Рекомендации берутся из предрассчитанного списка пользователя
+        (paintings.recommendations), который обновляется при изменении
+        избранного. Пока избранного нет — отдаём свежие картины.
+        """
         user = self.request.user
+        if Recommendation.objects.filter(user=user).exists():
+            queryset = Painting.active.filter(
+                recommendations__user=user
+            ).annotate(recommendation_score=F("recommendations__score"))
+        else:
+            # Порядок (-created_at, -id) задаёт RecommendationPagination.
+            queryset = Painting.active.exclude(favorite__user=user)
+        return self.narrow(queryset.for_listing(user))
+
+
+class CacheStatsView(APIView):
+    """
+    GET /cache/stats/ — версия и счётчики попаданий/промахов кеша
+    ответов для мониторинга.
+    """
+
+    permission_classes = [IsAdminUser]
 
-        liked_paintings = Painting.objects.filter(favorite__user=user)
+    def get(self, request):
+        return Response(stats())
 
-        liked_tag_ids = Tags.objects.filter(
-            paintings__in=liked_paintings
-        ).values_list("id", flat=True)
 
-        queryset = (
-            Painting.objects.all()
-            .annotate(
-                shared_tags=Count("tags", filter=Q(tags__in=liked_tag_ids))
+class CatalogueExportView(APIView):
+    """
+    GET /export/paintings/?output=ndjson|csv — потоковая выгрузка всего
+    каталога (вместе с архивом) для персонала, см. paintings.export.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        export_format = request.query_params.get("output", "ndjson")
+        if export_format not in export.FORMATS:
+            raise ValidationError(
+                {"output": f"Доступны: {', '.join(export.FORMATS)}."}
             )
-            .order_by("-shared_tags", "title")
+        content = export.blocks(
+            export.export_lines(export_format, export.export_rows())
         )
-
-        return queryset
+        if isinstance(request._request, ASGIRequest):
+            content = export.aiterate(content)
+        response = StreamingHttpResponse(
+            content, content_type=export.CONTENT_TYPES[export_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="paintings.{export_format}"'
+        )
+        return response
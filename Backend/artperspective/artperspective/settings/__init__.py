@@ -0,0 +1,16 @@
+"""
+Настройки разбиты на профили: base — общая часть, development — локальная
+разработка (по умолчанию), production — боевой сервер. Профиль выбирает
+переменная окружения DJANGO_ENV, поэтому DJANGO_SETTINGS_MODULE остаётся
+artperspective.settings.
+"""
+import os
+
+from artperspective.settings.base import *  # noqa: F401,F403
+
+DJANGO_ENV = os.environ.get("DJANGO_ENV", "development").lower()
+
+if DJANGO_ENV == "production":
+    from artperspective.settings.production import *  # noqa: F401,F403
+else:
+    from artperspective.settings.development import *  # noqa: F401,F403
@@ -1,5 +1,6 @@
 """
-Django settings for artperspective project.
+Django settings for artperspective project — common part of all profiles
+(see artperspective/settings/__init__.py).
 
 Generated by 'django-admin startproject' using Django 5.2.1.
 
@@ -20,7 +21,7 @@ from corsheaders.defaults import default_headers
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
 # Quick-start development settings - unsuitable for production
@@ -30,7 +31,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Включается профилем development.
+DEBUG = False
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -62,6 +64,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sitemaps",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "django_filters",
@@ -69,9 +72,11 @@ INSTALLED_APPS = [
     "api.apps.ApiConfig",
     "paintings.apps.PaintingsConfig",
     "users.apps.UsersConfig",
+    "tasks.apps.TasksConfig",
 ]
 
 MIDDLEWARE = [
+    "api.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -82,6 +87,18 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Инструментирование запросов: Server-Timing, JSON-логи и /metrics
+# (см. api.instrumentation). Выключено по умолчанию.
+INSTRUMENTATION = (
+    os.environ.get("INSTRUMENTATION", "false").lower() == "true"
+)
+if INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "api.instrumentation.InstrumentationMiddleware")
+
+# Ответы короче не сжимаются (см. api.compression): выигрыш меньше
+# накладных расходов.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
 ROOT_URLCONF = "artperspective.urls"
 
 TEMPLATES = [
@@ -127,6 +144,45 @@ else:
         }
     }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    # Общий для всех воркеров кеш; в боевом профиле обязателен.
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+else:
+    # Кеш процесса: только для разработки с одним процессом.
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 300))
+# Ключ карты сайта включает версию кеша (api.cache.make_key), и любое
+# изменение каталога её сбрасывает — поэтому в общем кеше (Redis) карту
+# можно держать сутки. В кеше процесса версию, поднятую импортом или
+# воркером задач, этот процесс не увидит: там срок как у ответов API.
+SITEMAP_CACHE_TIMEOUT = int(
+    os.environ.get(
+        "SITEMAP_CACHE_TIMEOUT", 86400 if REDIS_URL else API_CACHE_TIMEOUT
+    )
+)
+
+# Background tasks
+# Без воркера (manage.py run_tasks) задачи можно выполнять сразу в запросе.
+
+TASKS_EAGER = os.environ.get("TASKS_EAGER", "false").lower() == "true"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -152,6 +208,16 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
+    # orjson, если установлен; иначе — стандартный json (api.renderers).
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 
@@ -193,3 +259,18 @@ MEDIA_ROOT = BASE_DIR / "media"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.instrumentation": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
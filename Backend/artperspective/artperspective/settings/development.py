@@ -0,0 +1,4 @@
+"""Локальная разработка: DEBUG и новое соединение с базой на запрос."""
+from artperspective.settings.base import *  # noqa: F401,F403
+
+DEBUG = True
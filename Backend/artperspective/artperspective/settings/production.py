@@ -0,0 +1,95 @@
+"""
+Боевой профиль (DJANGO_ENV=production).
+
+Соединения с Postgres переиспользуются: при SERVER_MODE=wsgi —
+постоянные соединения (CONN_MAX_AGE) с проверкой перед запросом, при
+ASGI — пул psycopg 3 (постоянные соединения под ASGI не
+поддерживаются). Шаблоны кешируются. Кеш — только общий Redis
+(REDIS_URL): версию каталога и отметки ETag пишут все воркеры gunicorn и
+воркер задач, с LocMemCache каждый видел бы только свои. Если включено
+что-то, что годится только для отладки, процесс не стартует.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from artperspective.settings.base import *  # noqa: F401,F403
+from artperspective.settings.base import (
+    ALLOWED_HOSTS,
+    DATABASES,
+    DB_ENGINE,
+    INSTALLED_APPS,
+    REDIS_URL,
+    SECRET_KEY,
+    TASKS_EAGER,
+    TEMPLATES,
+)
+
+DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
+# Database
+
+DB_POOL = os.environ.get(
+    "DB_POOL", "true" if SERVER_MODE == "asgi" else "false"
+).lower() == "true"
+
+if DB_ENGINE != "sqlite":
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    if DB_POOL:
+        # Пул на процесс: WEB_CONCURRENCY × DB_POOL_MAX_SIZE не должно
+        # превышать max_connections Postgres (проверяет gunicorn.conf.py).
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+                "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+            },
+        }
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = int(
+            os.environ.get("CONN_MAX_AGE", 60)
+        )
+
+# Templates
+
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["debug"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
+
+def check_production_settings():
+    """Список настроек, с которыми боевой профиль запускать нельзя."""
+    problems = []
+    if DEBUG:
+        problems.append("DEBUG включён")
+    if not SECRET_KEY:
+        problems.append("не задан SECRET_KEY")
+    if "*" in ALLOWED_HOSTS:
+        problems.append("ALLOWED_HOSTS разрешает любой хост")
+    if TASKS_EAGER:
+        problems.append("TASKS_EAGER выполняет фоновые задачи в запросе")
+    if DB_ENGINE == "sqlite":
+        problems.append("база SQLite")
+    if not REDIS_URL:
+        problems.append("не задан REDIS_URL: кеш не общий для процессов")
+    if "debug_toolbar" in INSTALLED_APPS:
+        problems.append("подключён debug_toolbar")
+    return problems
+
+
+_problems = check_production_settings()
+if _problems:
+    raise ImproperlyConfigured(
+        "Боевой профиль не запущен: " + "; ".join(_problems) + "."
+    )
@@ -19,8 +19,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
+from django.contrib.sitemaps.views import index, sitemap
 
+from api.cache import cache_anonymous
+from api.instrumentation import metrics_view
 from paintings.sitemaps import PaintingSitemap, ArtistSitemap
 
 
@@ -37,5 +39,19 @@ urlpatterns = [
 ]
 
 urlpatterns += [
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemap"),
+    path(
+        "sitemap.xml",
+        cache_anonymous(index, settings.SITEMAP_CACHE_TIMEOUT),
+        {"sitemaps": sitemaps, "sitemap_url_name": "sitemap-section"},
+        name="sitemap",
+    ),
+    path(
+        "sitemap-<section>.xml",
+        cache_anonymous(sitemap, settings.SITEMAP_CACHE_TIMEOUT),
+        {"sitemaps": sitemaps},
+        name="sitemap-section",
+    ),
 ]
+
+if settings.INSTRUMENTATION:
+    urlpatterns += [path("metrics", metrics_view, name="metrics")]
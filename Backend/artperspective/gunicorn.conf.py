@@ -0,0 +1,59 @@
+"""
+Настройки gunicorn (читаются автоматически из рабочего каталога).
+
+SERVER_MODE=wsgi (по умолчанию) — синхронные воркеры и
+artperspective.wsgi: представления API синхронные, и на нагрузке этого
+проекта такие воркеры быстрее. SERVER_MODE=asgi — воркеры uvicorn и
+artperspective.asgi; включать, если loadtest на боевом стеке покажет
+выигрыш. Для сравнения режимов держите WEB_CONCURRENCY одинаковым (см.
+manage.py loadtest).
+
+Каждый воркер держит свои соединения с Postgres: одно постоянное в
+режиме wsgi или пул до DB_POOL_MAX_SIZE (DB_POOL, по умолчанию при
+asgi, см. settings/production.py). Воркеры × соединения на воркер не
+должны превышать DB_MAX_CONNECTIONS (max_connections Postgres) за
+вычетом DB_RESERVED_CONNECTIONS — запаса для воркера задач, миграций и
+psql. По умолчанию воркеров 2 × CPU + 1, но не больше этого предела;
+явный WEB_CONCURRENCY сверх предела — ошибка запуска.
+"""
+import multiprocessing
+import os
+import sys
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+DB_POOL = os.environ.get(
+    "DB_POOL", "true" if SERVER_MODE == "asgi" else "false"
+).lower() == "true"
+DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", 100))
+DB_RESERVED_CONNECTIONS = int(os.environ.get("DB_RESERVED_CONNECTIONS", 10))
+
+connections_per_worker = (
+    int(os.environ.get("DB_POOL_MAX_SIZE", 10)) if DB_POOL else 1
+)
+max_workers = max(
+    1,
+    (DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS) // connections_per_worker,
+)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8080")
+workers = int(
+    os.environ.get(
+        "WEB_CONCURRENCY",
+        min(multiprocessing.cpu_count() * 2 + 1, max_workers),
+    )
+)
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+if workers > max_workers:
+    sys.exit(
+        f"WEB_CONCURRENCY={workers} × {connections_per_worker} соединений "
+        f"на воркер превышает DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS} "
+        f"(запас {DB_RESERVED_CONNECTIONS}): не больше {max_workers} "
+        f"воркеров."
+    )
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "artperspective.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "artperspective.wsgi:application"
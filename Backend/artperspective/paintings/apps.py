@@ -6,3 +6,6 @@ class PaintingsConfig(AppConfig):
     name = "paintings"
     verbose_name = "Картины"
     verbose_name_plural = "Картины"
+
+    def ready(self):
+        from paintings import signals  # noqa: F401
@@ -0,0 +1,67 @@
+"""
+Денормализованные счётчики популярности: Painting.favorites_count и
+Tags.paintings_count.
+
+Меняются одним UPDATE ... SET n = n + delta (F-выражение) в той же
+транзакции, что и строка Favorite/PaintingTag (см. paintings.signals),
+поэтому параллельные запросы не теряют приращений. bulk_create, loaddata
+и правки базы в обход ORM сигналов не шлют — после них счётчики сверяет
+recount() (manage.py recount_counters).
+"""
+from collections import Counter
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from paintings.models import Favorite, Painting, PaintingTag, Tags
+
+
+def _change(model, field, ids, delta):
+    """
+    Сдвигает счётчик field на delta за каждое вхождение id в ids.
+    Одинаковые приращения объединяются в один UPDATE.
+    """
+    groups = {}
+    for pk, times in Counter(ids).items():
+        groups.setdefault(times, []).append(pk)
+    for times, pks in groups.items():
+        model.objects.filter(pk__in=pks).update(
+            **{field: F(field) + delta * times}
+        )
+
+
+def change_favorites(painting_ids, delta):
+    _change(Painting, "favorites_count", painting_ids, delta)
+
+
+def change_tag_paintings(tag_ids, delta):
+    _change(Tags, "paintings_count", tag_ids, delta)
+
+
+def _recount(model, field, related, key):
+    actual = Coalesce(
+        Subquery(
+            related.objects.filter(**{key: OuterRef("pk")})
+            .order_by()
+            .values(key)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        Value(0),
+    )
+    return (
+        model.objects.annotate(actual=actual)
+        .exclude(**{field: F("actual")})
+        .update(**{field: actual})
+    )
+
+
+def recount():
+    """
+    Пересчитывает счётчики по Favorite и PaintingTag; трогает только
+    разошедшиеся строки. Возвращает (картин, тегов) исправлено.
+    """
+    return (
+        _recount(Painting, "favorites_count", Favorite, "painting"),
+        _recount(Tags, "paintings_count", PaintingTag, "tag"),
+    )
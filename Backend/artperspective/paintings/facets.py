@@ -0,0 +1,79 @@
+"""
+Фасеты каталога: сколько картин выборки приходится на каждый тег,
+художника и десятилетие.
+
+Все фасеты считаются одним запросом: UNION ALL трёх GROUP BY по id
+выборки, переданным подзапросом; теги считаются по PaintingTag через
+индекс (tag, painting), сами картины не читаются. Общее число картин —
+сумма по десятилетиям (год есть у каждой картины), отдельного COUNT
+нет. При фильтре по всем тегам (tags_match=all) число у тега — ровно
+столько картин останется, если добавить его к фильтру.
+
+Postgres обрезает теги и художников до LIMIT внутри UNION; SQLite не
+допускает ORDER BY/LIMIT в частях составного запроса
+(supports_slicing_ordering_in_compound), там группы приходят целиком и
+обрезаются здесь — их не больше, чем тегов и художников.
+"""
+from django.db import connections
+from django.db.models import Count, F, Value
+
+from paintings.models import Painting, PaintingTag
+
+# Сколько тегов и художников отдаём, самые частые первыми.
+LIMIT = 100
+
+
+def _facet(queryset, kind, key, name, counted):
+    """Строки (вид, id, название, число) одного фасета."""
+    return (
+        queryset.order_by()
+        .values(facet_key=key)
+        .annotate(
+            facet_kind=Value(kind),
+            facet_name=name,
+            facet_count=Count(counted),
+        )
+        .values_list("facet_kind", "facet_key", "facet_name", "facet_count")
+    )
+
+
+def _top(queryset, limit):
+    features = connections[queryset.db].features
+    if not features.supports_slicing_ordering_in_compound:
+        return queryset
+    return queryset.order_by("-facet_count", "facet_name")[:limit]
+
+
+def facet_counts(queryset, limit=LIMIT):
+    """Число картин и фасеты для выборки queryset (уже отфильтрованной)."""
+    ids = queryset.order_by().values("pk")
+    paintings = Painting.objects.filter(pk__in=ids)
+    tags = _facet(
+        PaintingTag.objects.filter(painting_id__in=ids),
+        "tags",
+        F("tag_id"),
+        F("tag__name"),
+        "painting_id",
+    )
+    artists = _facet(
+        paintings, "artists", F("artist_id"), F("artist__name"), "pk"
+    )
+    decades = _facet(
+        paintings, "decades", F("year") / 10 * 10, Value(""), "pk"
+    )
+    facets = {"tags": [], "artists": [], "decades": []}
+    query = _top(tags, limit).union(_top(artists, limit), decades, all=True)
+    for kind, key, name, count in query:
+        if kind == "decades":
+            facets[kind].append({"decade": key, "count": count})
+        else:
+            facets[kind].append({"id": key, "name": name, "count": count})
+    for kind in ("tags", "artists"):
+        facets[kind] = sorted(
+            facets[kind], key=lambda row: (-row["count"], row["name"])
+        )[:limit]
+    facets["decades"].sort(key=lambda row: row["decade"])
+    return {
+        "count": sum(row["count"] for row in facets["decades"]),
+        **facets,
+    }
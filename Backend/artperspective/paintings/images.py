@@ -0,0 +1,138 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+# Ширины производных изображений для srcset.
+WIDTHS = (320, 640, 1280)
+# Расширение файла → (формат Pillow, параметры сохранения).
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def derivative_name(name, width, extension):
+    """paintings/1.jpg → paintings/1_320w.webp (рядом с оригиналом)."""
+    root, _ = os.path.splitext(name)
+    return f"{root}_{width}w.{extension}"
+
+
+def derivative_names(name):
+    return [
+        derivative_name(name, width, extension)
+        for width in WIDTHS
+        for extension in FORMATS
+    ]
+
+
+def ready_field(field):
+    """Флаг модели «производные поля field построены» (image_derivatives)."""
+    return f"{field}_derivatives"
+
+
+def has_derivatives(name, storage=default_storage):
+    return storage.exists(derivative_name(name, WIDTHS[-1], "jpg"))
+
+
+def generate_derivatives(name, storage=default_storage, force=False):
+    """
+    Создаёт производные изображения всех ширин и форматов. Ширины больше
+    оригинала не увеличиваются, а сохраняются в исходном размере, чтобы
+    набор файлов (и srcset) был одинаковым для любой картинки.
+    Возвращает число записанных файлов.
+    """
+    if not name or (not force and has_derivatives(name, storage)):
+        return 0
+    with storage.open(name, "rb") as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image.load()
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    written = 0
+    for width in WIDTHS:
+        resized = image
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            target = derivative_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(buffer.getvalue()))
+            written += 1
+    return written
+
+
+def strip_metadata(name, storage=default_storage):
+    """
+    Перезаписывает оригинал без EXIF (геометки, модель камеры), применив
+    поворот из EXIF. Неповёрнутый JPEG пересохраняется с исходными
+    таблицами квантования — без потери качества. ICC-профиль сохраняется.
+    Многокадровые изображения (GIF, APNG, TIFF) не трогаются: save()
+    записал бы только первый кадр. Возвращает True, если файл был
+    перезаписан.
+    """
+    with storage.open(name, "rb") as original:
+        image = Image.open(original)
+        if getattr(image, "n_frames", 1) > 1:
+            return False
+        image.load()
+    exif = image.getexif()
+    if not exif and "exif" not in image.info:
+        return False
+    image_format = image.format
+    options = {"icc_profile": image.info.get("icc_profile")}
+    if exif.get(ExifTags.Base.Orientation, 1) != 1:
+        image = ImageOps.exif_transpose(image)
+        if image_format == "JPEG":
+            options["quality"] = 95
+    elif image_format == "JPEG":
+        options["quality"] = "keep"
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    replace_file(name, buffer.getvalue(), storage)
+    return True
+
+
+def replace_file(name, content, storage=default_storage):
+    """
+    Заменяет файл name содержимым content. Копия сначала сохраняется
+    под временным именем, поэтому сбой записи не оставит картину без
+    оригинала; на диске замена — атомарный os.replace.
+    """
+    root, extension = os.path.splitext(name)
+    temporary = storage.save(f"{root}_tmp{extension}", ContentFile(content))
+    try:
+        source, target = storage.path(temporary), storage.path(name)
+    except NotImplementedError:
+        # Хранилище без локальных путей: временная копия удаляется
+        # только после успешной записи под исходным именем.
+        storage.delete(name)
+        storage.save(name, ContentFile(content))
+        storage.delete(temporary)
+    else:
+        try:
+            os.replace(source, target)
+        except OSError:
+            storage.delete(temporary)
+            raise
+
+
+def delete_derivatives(name, storage=default_storage):
+    for target in derivative_names(name):
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def srcset(name, build_url, extension, storage=default_storage):
+    """Строка srcset для производных одного формата; без обращения к диску."""
+    return ", ".join(
+        f"{build_url(storage.url(derivative_name(name, width, extension)))} "
+        f"{width}w"
+        for width in WIDTHS
+    )
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from paintings.export import (
+    CHUNK_SIZE,
+    FORMATS,
+    blocks,
+    export_lines,
+    export_rows,
+)
+from paintings.models import Painting
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая выгрузка каталога (картины с художником и тегами) в "
+        "NDJSON или CSV в формате import_catalogue. Картины читаются "
+        "пачками по --chunk-size, память не растёт с размером каталога."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="Файл или - для stdout."
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Формат (по умолчанию — по расширению файла).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Картин в одной пачке из базы.",
+        )
+        parser.add_argument(
+            "--active",
+            action="store_true",
+            help="Только картины не в архиве.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        export_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size должен быть положительным.")
+        queryset = Painting.active.all() if options["active"] else None
+        rows = export_rows(queryset, options["chunk_size"])
+        lines = export_lines(export_format, self.counted(rows))
+        self.exported = 0
+        started = time.perf_counter()
+
+        if path == "-":
+            for block in blocks(lines, options["chunk_size"]):
+                self.stdout.write(block, ending="")
+            return
+        try:
+            output = open(path, "w", encoding="utf-8", newline="")
+        except OSError as error:
+            raise CommandError(error)
+        with output:
+            for block in blocks(lines, options["chunk_size"]):
+                output.write(block)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Выгружено картин: {self.exported} в {path} "
+                f"за {time.perf_counter() - started:.1f} с."
+            )
+        )
+
+    def counted(self, rows):
+        for self.exported, row in enumerate(rows, 1):
+            yield row
@@ -0,0 +1,239 @@
+import time
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import bump_version
+from paintings.counters import recount
+from paintings.models import Artist, Favorite, Painting, PaintingTag, Tags
+from paintings.recommendations import rebuild_recommendations
+from paintings.search import update_search_vectors
+from paintings.similarity import rebuild_similarity
+
+BATCH_SIZE = 5000
+STYLES = [
+    "Impressionism",
+    "Expressionism",
+    "Realism",
+    "Surrealism",
+    "Cubism",
+    "Abstract",
+    "Romanticism",
+    "Baroque",
+    "Portrait",
+    "Landscape",
+    "Still life",
+    "Pop art",
+]
+WORDS = [
+    "утро", "закат", "море", "город", "портрет", "сад", "река", "дорога",
+    "зима", "лес", "женщина", "ночь", "поле", "окно", "мост", "цветы",
+    "light", "shadow", "garden", "harbor", "dream", "silence", "window",
+]
+
+
+def zipf_weights(size, exponent):
+    """Степенное распределение: немного популярных, длинный хвост."""
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def sample_pairs(rng, owners, sizes, values, weights):
+    """
+    Для каждого owners[i] выбирает sizes[i] значений с весами weights
+    одной векторной выборкой; повторы внутри владельца отбрасываются.
+    """
+    chosen = rng.choice(values, size=int(sizes.sum()), p=weights)
+    pairs = np.column_stack([np.repeat(owners, sizes), chosen])
+    return np.unique(pairs, axis=0)
+
+
+def bulk_create_pairs(model, first, second, pairs):
+    for start in range(0, len(pairs), BATCH_SIZE):
+        model.objects.bulk_create(
+            [
+                model(**{first: left, second: right})
+                for left, right in pairs[start:start + BATCH_SIZE].tolist()
+            ]
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическим каталогом в формате fixture.json "
+        "(художники, теги, картины, пользователи, избранное) для "
+        "бенчмарков: популярность тегов, художников и картин распределена "
+        "по Ципфу. После генерации пересчитываются счётчики популярности, "
+        "индексы похожих картин, рекомендации и поисковые векторы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--paintings",
+            type=int,
+            default=1000,
+            help="Сколько картин создать (например, 1000/10000/100000).",
+        )
+        parser.add_argument(
+            "--artists",
+            type=int,
+            help="Сколько художников (по умолчанию — картины / 50).",
+        )
+        parser.add_argument(
+            "--tags", type=int, default=300, help="Размер словаря тегов."
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            help="Сколько пользователей (по умолчанию — картины / 20).",
+        )
+        parser.add_argument(
+            "--favorites",
+            type=int,
+            default=20,
+            help="Среднее число картин в избранном у пользователя.",
+        )
+        parser.add_argument(
+            "--archived",
+            type=float,
+            default=0.05,
+            help="Доля картин в архиве.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Удалить существующий каталог и пользователей bench*.",
+        )
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        paintings = options["paintings"]
+        artists = options["artists"] or max(1, paintings // 50)
+        users = options["users"] or max(1, paintings // 20)
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            if options["clear"]:
+                self.clear()
+            prefix = f"bench{int(time.time())}"
+            tag_ids = self.create_tags(options["tags"], prefix)
+            artist_ids = self.create_artists(artists, prefix)
+            painting_ids = self.create_paintings(
+                rng, paintings, artist_ids, options["archived"]
+            )
+            self.create_painting_tags(rng, painting_ids, tag_ids)
+            user_ids = self.create_users(users, prefix)
+            favorites = self.create_favorites(
+                rng, user_ids, painting_ids, options["favorites"]
+            )
+        self.stdout.write(
+            f"Создано: художников {artists}, тегов {len(tag_ids)}, "
+            f"картин {paintings}, пользователей {users}, "
+            f"избранного {favorites} за "
+            f"{time.perf_counter() - started:.1f} с. Пересчёт индексов…"
+        )
+
+        # bulk_create не шлёт сигналов, счётчики считаются здесь.
+        recount()
+        rebuild_similarity()
+        rebuild_recommendations()
+        update_search_vectors()
+        bump_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово за {time.perf_counter() - started:.1f} с. "
+                f"Пароль пользователей {prefix}-*: bench."
+            )
+        )
+
+    def clear(self):
+        Painting.objects.all().delete()
+        Artist.objects.all().delete()
+        Tags.objects.all().delete()
+        get_user_model().objects.filter(username__startswith="bench").delete()
+
+    def create_tags(self, count, prefix):
+        names = [
+            STYLES[index] if index < len(STYLES) else f"{prefix}-tag-{index}"
+            for index in range(count)
+        ]
+        Tags.objects.bulk_create(
+            [Tags(name=name) for name in names], ignore_conflicts=True
+        )
+        ids = dict(
+            Tags.objects.filter(name__in=names).values_list("name", "pk")
+        )
+        # Порядок важен: первые теги — самые популярные.
+        return np.array([ids[name] for name in names])
+
+    def create_artists(self, count, prefix):
+        objs = [
+            Artist(
+                name=f"{prefix}-artist-{index}",
+                bio="Синтетический художник для бенчмарков",
+                image="artists/images.png",
+            )
+            for index in range(count)
+        ]
+        created = Artist.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        return np.array([artist.pk for artist in created])
+
+    def create_paintings(self, rng, count, artist_ids, archived):
+        artist_choice = rng.choice(
+            artist_ids, size=count, p=zipf_weights(len(artist_ids), 1.0)
+        )
+        years = np.clip(rng.normal(1900, 80, size=count), 1400, 2025)
+        is_archived = rng.random(count) < archived
+        words = rng.choice(WORDS, size=(count, 3))
+        ids = []
+        for start in range(0, count, BATCH_SIZE):
+            objs = [
+                Painting(
+                    title=" ".join(words[index]).capitalize(),
+                    artist_id=int(artist_choice[index]),
+                    year=int(years[index]),
+                    image=f"paintings/{index % 9 + 1}.jpg",
+                    description=" ".join(words[index][::-1]),
+                    archive=bool(is_archived[index]),
+                )
+                for index in range(start, min(start + BATCH_SIZE, count))
+            ]
+            ids.extend(
+                painting.pk for painting in Painting.objects.bulk_create(objs)
+            )
+        return np.array(ids)
+
+    def create_painting_tags(self, rng, painting_ids, tag_ids):
+        sizes = np.clip(rng.poisson(3, size=len(painting_ids)), 1, 8)
+        pairs = sample_pairs(
+            rng, painting_ids, sizes, tag_ids, zipf_weights(len(tag_ids), 1.1)
+        )
+        bulk_create_pairs(PaintingTag, "painting_id", "tag_id", pairs)
+
+    def create_users(self, count, prefix):
+        User = get_user_model()
+        password = make_password("bench")
+        created = User.objects.bulk_create(
+            [
+                User(username=f"{prefix}-{index}", password=password)
+                for index in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return [user.pk for user in created]
+
+    def create_favorites(self, rng, user_ids, painting_ids, average):
+        sizes = np.clip(rng.poisson(average, size=len(user_ids)), 0, None)
+        pairs = sample_pairs(
+            rng,
+            np.array(user_ids),
+            sizes,
+            rng.permutation(painting_ids),
+            zipf_weights(len(painting_ids), 0.8),
+        )
+        bulk_create_pairs(Favorite, "user_id", "painting_id", pairs)
+        return len(pairs)
@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.cache import bump_version
+from paintings.images import generate_derivatives, ready_field
+from paintings.models import Artist, Painting
+
+# Имён в одном IN при отметке флагов.
+BATCH = 500
+
+
+def image_sources():
+    return (
+        (Painting, ("image",)),
+        (Artist, ("image", "background")),
+        (get_user_model(), ("avatar",)),
+    )
+
+
+def image_names():
+    names = set()
+    for model, fields in image_sources():
+        for row in model.objects.values_list(*fields):
+            names.update(name for name in row if name)
+    return sorted(names)
+
+
+def mark_ready(names):
+    """Ставит флаги <поле>_derivatives строкам с файлами из names."""
+    names = sorted(names)
+    for start in range(0, len(names), BATCH):
+        batch = names[start:start + BATCH]
+        for model, fields in image_sources():
+            for field in fields:
+                model.objects.filter(**{f"{field}__in": batch}).update(
+                    **{ready_field(field): True}
+                )
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт производные изображения (320/640/1280, WebP и JPEG) для "
+        "уже загруженных картин, художников и аватаров в пуле процессов "
+        "и отмечает их готовыми: после этого API отдаёт srcset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Число процессов (по умолчанию — по числу ядер).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать производные, даже если они уже есть.",
+        )
+
+    def handle(self, *args, **options):
+        names = image_names()
+        # Дочерние процессы не должны наследовать открытые соединения с БД.
+        connections.close_all()
+        written = failed = 0
+        ready = set()
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], mp_context=get_context("fork")
+        ) as pool:
+            futures = {
+                pool.submit(
+                    generate_derivatives, name, force=options["force"]
+                ): name
+                for name in names
+            }
+            for future in as_completed(futures):
+                try:
+                    written += future.result()
+                except Exception as error:
+                    # Битый файл (ошибка Pillow любого рода) не должен
+                    # останавливать остальные.
+                    failed += 1
+                    self.stderr.write(
+                        f"{futures[future]}: {type(error).__name__}: {error}"
+                    )
+                else:
+                    ready.add(futures[future])
+        # srcset отдаётся только для отмеченных картинок.
+        mark_ready(ready)
+        bump_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Изображений: {len(names)}, записано файлов: {written}, "
+                f"ошибок: {failed}."
+            )
+        )
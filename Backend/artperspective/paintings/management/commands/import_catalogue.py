@@ -0,0 +1,319 @@
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import bump_version
+from paintings import counters
+from paintings.models import Artist, Painting, PaintingTag, Tags
+from paintings.recommendations import rebuild_recommendations
+from paintings.search import update_search_vectors
+from paintings.similarity import rebuild_similarity
+
+TRUE_VALUES = {"1", "true", "yes", "да"}
+
+
+def max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+TITLE_LENGTH = max_length(Painting, "title")
+NAME_LENGTH = max_length(Artist, "name")
+TAG_LENGTH = max_length(Tags, "name")
+
+
+def read_rows(stream, input_format):
+    """(номер строки, запись) по одной, не читая файл целиком."""
+    if input_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            yield number, line
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_row(record, separator):
+    """
+    Проверяет запись NDJSON (строка) или CSV (словарь) и приводит её к
+    словарю с полями картины. Ошибки — ValueError с текстом для отчёта.
+    """
+    if isinstance(record, str):
+        record = json.loads(record)
+        if not isinstance(record, dict):
+            raise ValueError("ожидался JSON-объект")
+    title = str(record.get("title") or "").strip()
+    artist = str(record.get("artist") or "").strip()
+    if not title or not artist:
+        raise ValueError("title и artist обязательны")
+    if len(title) > TITLE_LENGTH or len(artist) > NAME_LENGTH:
+        raise ValueError("слишком длинное название или имя художника")
+    try:
+        year = int(record.get("year"))
+    except (TypeError, ValueError):
+        raise ValueError(f"некорректный год: {record.get('year')!r}")
+    tags = record.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(separator)
+    elif not isinstance(tags, list):
+        raise ValueError("tags — список или строка через разделитель")
+    tags = list(dict.fromkeys(str(tag).strip() for tag in tags))
+    tags = [tag for tag in tags if tag]
+    if any(len(tag) > TAG_LENGTH for tag in tags):
+        raise ValueError("слишком длинное название тега")
+    archive = record.get("archive") or False
+    if isinstance(archive, str):
+        archive = archive.strip().lower() in TRUE_VALUES
+    return {
+        "title": title,
+        "artist": artist,
+        "artist_bio": str(record.get("artist_bio") or ""),
+        "year": year,
+        "description": str(record.get("description") or ""),
+        "image": str(record.get("image") or "").strip(),
+        "tags": tags,
+        "archive": bool(archive),
+    }
+
+
+def image_path(images_dir, name):
+    """
+    Путь к файлу name внутри images_dir (уже realpath). Имя приходит из
+    файла импорта, поэтому «../» и ссылки за пределы каталога — ошибка.
+    """
+    path = os.path.realpath(os.path.join(images_dir, name))
+    if os.path.commonpath([images_dir, path]) != images_dir:
+        raise ValueError(f"файл вне --images-dir: {name!r}")
+    return path
+
+
+def copy_image(path, storage=default_storage):
+    """Копирует файл в хранилище, в каталог upload_to поля Painting.image."""
+    upload_to = Painting._meta.get_field("image").upload_to
+    with open(path, "rb") as source:
+        return storage.save(
+            os.path.join(upload_to, os.path.basename(path)), File(source)
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковый импорт каталога из NDJSON или CSV (поля title, artist, "
+        "year, description, image, tags, archive, artist_bio). Файл "
+        "читается по строкам, каждые --batch-size строк сохраняются одной "
+        "транзакцией через bulk_create; художники и теги ищутся и "
+        "создаются пачками, изображения копируются в пуле потоков. Память "
+        "не растёт с размером файла."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл NDJSON/CSV или - для stdin.")
+        parser.add_argument(
+            "--format",
+            choices=("ndjson", "csv"),
+            help="Формат входа (по умолчанию — по расширению файла).",
+        )
+        parser.add_argument(
+            "--images-dir",
+            help=(
+                "Каталог с файлами изображений: image берётся относительно "
+                "него и копируется в хранилище. Без параметра image — уже "
+                "готовое имя файла в хранилище."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Строк в одной транзакции.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Потоков для копирования изображений.",
+        )
+        parser.add_argument(
+            "--tag-separator",
+            default=";",
+            help="Разделитель тегов в CSV.",
+        )
+        parser.add_argument(
+            "--skip-similarity",
+            action="store_true",
+            help=(
+                "Не пересобирать похожие картины и рекомендации (потом "
+                "build_similarity)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным.")
+        self.images_dir = options["images_dir"] and os.path.realpath(
+            options["images_dir"]
+        )
+        self.separator = options["tag_separator"]
+        # Имя → pk: словари растут с числом художников и тегов, а не картин.
+        self.artist_ids = {}
+        self.tag_ids = {}
+        self.imported = self.failed = 0
+        self.started = time.perf_counter()
+
+        if path == "-":
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(path, encoding="utf-8", newline="")
+            except OSError as error:
+                raise CommandError(error)
+        with stream, ThreadPoolExecutor(options["workers"]) as pool:
+            rows = read_rows(stream, input_format)
+            for chunk in chunked(rows, options["batch_size"]):
+                self.import_chunk(self.parse(chunk, pool))
+                if options["verbosity"] > 1:
+                    self.stdout.write(self.progress())
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f"{self.progress()}. Ошибок: {self.failed}.")
+        if not options["skip_similarity"]:
+            # Похожие строятся по всем тегам сразу, а не по картине;
+            # рекомендации считаются по ним.
+            self.stdout.write("Пересчёт похожих и рекомендаций…")
+            rebuild_similarity()
+            rebuild_recommendations()
+        # Последним шагом: закешированные ответы видят всё сразу.
+        bump_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово за {time.perf_counter() - self.started:.1f} с "
+                f"(импорт {elapsed:.1f} с). Производные изображения: "
+                f"manage.py generate_image_derivatives."
+            )
+        )
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"Импортировано картин: {self.imported} "
+            f"({self.imported / elapsed:.0f} строк/с)"
+        )
+
+    def skip(self, number, error):
+        self.failed += 1
+        self.stderr.write(f"Строка {number}: {error}")
+
+    def parse(self, chunk, pool):
+        """Разбор строк пачки и копирование их изображений."""
+        parsed = []
+        for number, record in chunk:
+            try:
+                parsed.append((number, parse_row(record, self.separator)))
+            except ValueError as error:
+                self.skip(number, error)
+        if not self.images_dir:
+            return [row for _, row in parsed]
+
+        def copy(item):
+            number, row = item
+            if not row["image"]:
+                return number, row, None
+            try:
+                row["image"] = copy_image(
+                    image_path(self.images_dir, row["image"])
+                )
+            except (OSError, ValueError) as error:
+                return number, row, error
+            return number, row, None
+
+        rows = []
+        for number, row, error in pool.map(copy, parsed):
+            if error is None:
+                rows.append(row)
+            else:
+                self.skip(number, error)
+        return rows
+
+    def resolve_artists(self, rows):
+        missing = {row["artist"] for row in rows} - self.artist_ids.keys()
+        if not missing:
+            return
+        # Имя художника не уникально: берётся самый ранний с таким именем.
+        existing = Artist.objects.filter(name__in=missing).order_by("-pk")
+        self.artist_ids.update(existing.values_list("name", "pk"))
+        bios = {row["artist"]: row["artist_bio"] for row in rows}
+        created = Artist.objects.bulk_create(
+            [
+                Artist(name=name, bio=bios[name])
+                for name in sorted(missing - self.artist_ids.keys())
+            ]
+        )
+        self.artist_ids.update((artist.name, artist.pk) for artist in created)
+
+    def resolve_tags(self, rows):
+        names = {tag for row in rows for tag in row["tags"]}
+        missing = names - self.tag_ids.keys()
+        if not missing:
+            return
+        Tags.objects.bulk_create(
+            [Tags(name=name) for name in sorted(missing)],
+            ignore_conflicts=True,
+        )
+        self.tag_ids.update(
+            Tags.objects.filter(name__in=missing).values_list("name", "pk")
+        )
+
+    def import_chunk(self, rows):
+        if not rows:
+            return
+        with transaction.atomic():
+            self.resolve_artists(rows)
+            self.resolve_tags(rows)
+            paintings = Painting.objects.bulk_create(
+                [
+                    Painting(
+                        title=row["title"],
+                        artist_id=self.artist_ids[row["artist"]],
+                        year=row["year"],
+                        image=row["image"],
+                        description=row["description"],
+                        archive=row["archive"],
+                    )
+                    for row in rows
+                ]
+            )
+            links = [
+                PaintingTag(painting_id=painting.pk, tag_id=self.tag_ids[tag])
+                for painting, row in zip(paintings, rows)
+                for tag in row["tags"]
+            ]
+            PaintingTag.objects.bulk_create(links)
+            # bulk_create не шлёт сигналов: счётчики и поиск — здесь.
+            counters.change_tag_paintings(
+                [link.tag_id for link in links], 1
+            )
+            update_search_vectors(
+                Painting.objects.filter(
+                    pk__in=[painting.pk for painting in paintings]
+                )
+            )
+        self.imported += len(rows)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_version
+from paintings.counters import recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет счётчики популярности (Painting.favorites_count, "
+        "Tags.paintings_count) с избранным и тегами картин и исправляет "
+        "разошедшиеся, например после loaddata или bulk_create."
+    )
+
+    def handle(self, *args, **options):
+        paintings, tags = recount()
+        if paintings or tags:
+            bump_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Исправлено картин: {paintings}, тегов: {tags}."
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from paintings.search import is_supported, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает полнотекстовый вектор всех картин (только Postgres), "
+        "например после loaddata."
+    )
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write("Полнотекстовый индекс есть только в Postgres.")
+            return
+        count = update_search_vectors()
+        self.stdout.write(self.style.SUCCESS(f"Обновлено картин: {count}."))
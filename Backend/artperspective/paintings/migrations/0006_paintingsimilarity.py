@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+TOP_K = 50
+
+
+def build_similarity_index(apps, schema_editor):
+    Painting = apps.get_model("paintings", "Painting")
+    PaintingTag = apps.get_model("paintings", "PaintingTag")
+    PaintingSimilarity = apps.get_model("paintings", "PaintingSimilarity")
+    for painting_id in Painting.objects.values_list("pk", flat=True):
+        tag_ids = PaintingTag.objects.filter(
+            painting_id=painting_id
+        ).values("tag_id")
+        rows = (
+            PaintingTag.objects.filter(tag_id__in=tag_ids)
+            .exclude(painting_id=painting_id)
+            .values("painting_id")
+            .annotate(shared=Count("id"))
+            .order_by("-shared", "painting_id")[:TOP_K]
+        )
+        PaintingSimilarity.objects.bulk_create(
+            PaintingSimilarity(
+                painting_id=painting_id,
+                similar_id=row["painting_id"],
+                score=row["shared"],
+            )
+            for row in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0005_artist_background'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaintingSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Сходство')),
+                ('painting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='paintings.painting', verbose_name='Картина')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='paintings.painting', verbose_name='Похожая картина')),
+            ],
+            options={
+                'verbose_name': 'Похожая картина',
+                'verbose_name_plural': 'Похожие картины',
+                'indexes': [models.Index(fields=['painting', '-score'], name='paintings_p_paintin_98475d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('painting', 'similar'), name='unique_similarity')],
+            },
+        ),
+        migrations.RunPython(
+            build_similarity_index, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+LIMIT = 500
+
+
+def build_recommendations(apps, schema_editor):
+    Favorite = apps.get_model("paintings", "Favorite")
+    PaintingSimilarity = apps.get_model("paintings", "PaintingSimilarity")
+    Recommendation = apps.get_model("paintings", "Recommendation")
+    user_ids = Favorite.objects.values_list("user_id", flat=True).distinct()
+    for user_id in user_ids:
+        favorites = Favorite.objects.filter(user_id=user_id).values(
+            "painting_id"
+        )
+        rows = (
+            PaintingSimilarity.objects.filter(painting_id__in=favorites)
+            .exclude(similar_id__in=favorites)
+            .filter(similar__archive=False)
+            .values_list("similar_id")
+            .annotate(total=Sum("score"))
+            .order_by("-total", "similar_id")[:LIMIT]
+        )
+        Recommendation.objects.bulk_create(
+            Recommendation(user_id=user_id, painting_id=painting_id, score=score)
+            for painting_id, score in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0006_paintingsimilarity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+                ('painting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='paintings.painting', verbose_name='Картина')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Рекомендация',
+                'verbose_name_plural': 'Рекомендации',
+                'indexes': [models.Index(fields=['user', '-score', 'painting'], name='paintings_r_user_id_b0c1c7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'painting'), name='unique_recommendation')],
+            },
+        ),
+        migrations.RunPython(
+            build_recommendations, migrations.RunPython.noop
+        ),
+    ]
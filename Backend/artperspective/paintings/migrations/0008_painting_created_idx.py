@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0007_recommendation'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='painting',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Картина', 'verbose_name_plural': 'Картины'},
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(fields=['-created_at', '-id'], name='painting_created_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:48
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# GIN-индексы и заполнение вектора есть только в Postgres; на SQLite
+# поиск работает через обычный SearchFilter.
+CREATE_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX painting_search_idx ON paintings_painting "
+    "USING gin (search_vector)",
+    "CREATE INDEX painting_title_trgm_idx ON paintings_painting "
+    "USING gin (title gin_trgm_ops)",
+    "CREATE INDEX artist_name_trgm_idx ON paintings_artist "
+    "USING gin (name gin_trgm_ops)",
+    """
+    UPDATE paintings_painting p SET search_vector =
+        setweight(to_tsvector('russian', coalesce(p.title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(
+            (SELECT a.name FROM paintings_artist a WHERE a.id = p.artist_id),
+            '')), 'B')
+        || setweight(to_tsvector('russian', coalesce(
+            (SELECT string_agg(t.name, ' ')
+             FROM paintings_paintingtag pt
+             JOIN paintings_tags t ON t.id = pt.tag_id
+             WHERE pt.painting_id = p.id), '')), 'B')
+        || setweight(to_tsvector('russian', coalesce(p.description, '')), 'C')
+    """,
+]
+DROP_SQL = [
+    "DROP INDEX IF EXISTS painting_search_idx",
+    "DROP INDEX IF EXISTS painting_title_trgm_idx",
+    "DROP INDEX IF EXISTS artist_name_trgm_idx",
+]
+
+
+def run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0008_painting_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='painting',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_on_postgres(CREATE_SQL), run_on_postgres(DROP_SQL)
+        ),
+    ]
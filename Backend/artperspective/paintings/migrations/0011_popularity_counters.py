@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, key):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{key: OuterRef('pk')})
+            .order_by()
+            .values(key)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        Value(0),
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Painting = apps.get_model('paintings', 'Painting')
+    Tags = apps.get_model('paintings', 'Tags')
+    Favorite = apps.get_model('paintings', 'Favorite')
+    PaintingTag = apps.get_model('paintings', 'PaintingTag')
+    Painting.objects.update(favorites_count=count_of(Favorite, 'painting'))
+    Tags.objects.update(paintings_count=count_of(PaintingTag, 'tag'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0010_artist_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='painting',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='tags',
+            name='paintings_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число картин'),
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(fields=['-favorites_count', '-id'], name='painting_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tags',
+            index=models.Index(fields=['-paintings_count'], name='tag_popular_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0011_popularity_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='painting',
+            name='painting_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='painting',
+            name='painting_popular_idx',
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(condition=models.Q(('archive', False)), fields=['-created_at', '-id'], name='painting_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(condition=models.Q(('archive', False)), fields=['-favorites_count', '-id'], name='painting_active_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0012_painting_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='background_derivatives',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Производные фона готовы'),
+        ),
+        migrations.AddField(
+            model_name='artist',
+            name='image_derivatives',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Производные готовы'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='image_derivatives',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Производные готовы'),
+        ),
+    ]
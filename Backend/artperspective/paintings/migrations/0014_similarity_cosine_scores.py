@@ -0,0 +1,81 @@
+"""
+0006 заполнила PaintingSimilarity.score числом общих тегов, а движок
+paintings.similarity пишет косинусное сходство в [0, 1]. Смесь шкал
+ломает сортировку похожих и суммы рекомендаций, поэтому индекс и
+рекомендации пересобираются здесь тем же движком (как manage.py
+build_similarity). На 100 тыс. картин это около 40 с.
+"""
+import numpy as np
+from django.db import migrations
+from django.db.models import Count, Sum
+
+from paintings.similarity import BATCH_SIZE, build_matrix, top_neighbours
+
+LIMIT = 500
+
+
+def rebuild(apps, schema_editor):
+    Painting = apps.get_model('paintings', 'Painting')
+    PaintingTag = apps.get_model('paintings', 'PaintingTag')
+    PaintingSimilarity = apps.get_model('paintings', 'PaintingSimilarity')
+    Favorite = apps.get_model('paintings', 'Favorite')
+    Recommendation = apps.get_model('paintings', 'Recommendation')
+
+    PaintingSimilarity.objects.all().delete()
+    pairs = list(PaintingTag.objects.values_list('painting_id', 'tag_id'))
+    if pairs:
+        total = Painting.objects.count()
+        weights = {
+            tag_id: np.log((1 + total) / (1 + paintings)) + 1.0
+            for tag_id, paintings in PaintingTag.objects.values_list(
+                'tag_id'
+            ).annotate(paintings=Count('painting_id'))
+        }
+        painting_ids, matrix = build_matrix(pairs, weights)
+        # Пишем по блокам движка: весь индекс в памяти не держим.
+        for sources, targets, scores in top_neighbours(painting_ids, matrix):
+            PaintingSimilarity.objects.bulk_create(
+                (
+                    PaintingSimilarity(
+                        painting_id=painting_id,
+                        similar_id=similar_id,
+                        score=score,
+                    )
+                    for painting_id, similar_id, score in zip(
+                        sources.tolist(), targets.tolist(), scores.tolist()
+                    )
+                ),
+                batch_size=BATCH_SIZE,
+            )
+
+    Recommendation.objects.all().delete()
+    user_ids = Favorite.objects.values_list('user_id', flat=True).distinct()
+    for user_id in user_ids:
+        favorites = Favorite.objects.filter(user_id=user_id).values(
+            'painting_id'
+        )
+        scores = (
+            PaintingSimilarity.objects.filter(painting_id__in=favorites)
+            .exclude(similar_id__in=favorites)
+            .filter(similar__archive=False)
+            .values_list('similar_id')
+            .annotate(total=Sum('score'))
+            .order_by('-total', 'similar_id')[:LIMIT]
+        )
+        Recommendation.objects.bulk_create(
+            Recommendation(
+                user_id=user_id, painting_id=painting_id, score=score
+            )
+            for painting_id, score in scores
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0013_derivatives_ready'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paintings', '0014_similarity_cosine_scores'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(fields=['name', 'id'], name='artist_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(condition=models.Q(('archive', False)), fields=['artist', '-year', '-id'], name='painting_active_artist_idx'),
+        ),
+    ]
@@ -1,14 +1,22 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connections, models
 
 
 class Tags(models.Model):
     name = models.CharField(
         max_length=255, unique=True, verbose_name="Название тега"
     )
+    # Денормализованы, см. paintings.counters.
+    paintings_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Число картин"
+    )
 
     class Meta:
         verbose_name = "Тег"
         verbose_name_plural = "Теги"
+        indexes = [
+            models.Index(fields=["-paintings_count"], name="tag_popular_idx")
+        ]
 
     def __str__(self):
         return self.name
@@ -23,16 +31,81 @@ class Artist(models.Model):
         verbose_name="Фоновое изображение",
         blank=True,
     )
+    # Производные (srcset) построены для текущих image и background;
+    # ставит задача paintings.tasks.process_image.
+    image_derivatives = models.BooleanField(
+        default=False, editable=False, verbose_name="Производные готовы"
+    )
+    background_derivatives = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Производные фона готовы",
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата обновления"
+    )
 
     class Meta:
         verbose_name = "Художник"
         verbose_name_plural = "Художники"
         ordering = ["name"]
+        indexes = [models.Index(fields=["name", "id"], name="artist_name_idx")]
 
     def __str__(self):
         return self.name
 
 
+class PaintingQuerySet(models.QuerySet):
+    def active(self):
+        """Публичный каталог: без картин в архиве."""
+        return self.filter(archive=False)
+
+    def with_related(self):
+        """Подгружает художника и теги, которые отдаёт сериализатор."""
+        return (
+            self.select_related("artist")
+            .prefetch_related("tags")
+            .defer("search_vector")
+        )
+
+    def with_favorites(self, user):
+        """
+        Аннотирует каждую картину флагом is_favorite для пользователя
+        одним подзапросом EXISTS на всю выборку.
+        """
+        if user is None or user.is_anonymous:
+            return self.annotate(
+                is_favorite=models.Value(
+                    False, output_field=models.BooleanField()
+                )
+            )
+        return self.annotate(
+            is_favorite=models.Exists(
+                Favorite.objects.filter(
+                    user=user, painting=models.OuterRef("pk")
+                )
+            )
+        )
+
+    def for_listing(self, user):
+        """
+        Общая выборка для всех списков картин в API: без N+1 по художнику,
+        тегам и избранному.
+        """
+        return self.with_related().with_favorites(user)
+
+
+class ActivePaintingManager(models.Manager.from_queryset(PaintingQuerySet)):
+    """
+    Painting.active — выборка для всех публичных мест (API, карта сайта,
+    похожие). Её покрывают частичные индексы WHERE archive = false, так
+    что архив не замедляет списки.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().active()
+
+
 class Painting(models.Model):
     title = models.CharField(max_length=255, verbose_name="Название")
     artist = models.ForeignKey(
@@ -45,6 +118,9 @@ class Painting(models.Model):
     image = models.ImageField(
         upload_to="paintings/", verbose_name="Изображение"
     )
+    image_derivatives = models.BooleanField(
+        default=False, editable=False, verbose_name="Производные готовы"
+    )
     description = models.TextField(verbose_name="Описание")
     tags = models.ManyToManyField(
         "Tags",
@@ -60,11 +136,38 @@ class Painting(models.Model):
         auto_now=True, verbose_name="Дата обновления"
     )
     archive = models.BooleanField(default=False, verbose_name="В архиве")
+    search_vector = SearchVectorField(
+        null=True, editable=False, verbose_name="Поисковый вектор"
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="В избранном"
+    )
+
+    objects = PaintingQuerySet.as_manager()
+    active = ActivePaintingManager()
 
     class Meta:
         verbose_name = "Картина"
         verbose_name_plural = "Картины"
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="painting_active_created_idx",
+                condition=models.Q(archive=False),
+            ),
+            models.Index(
+                fields=["-favorites_count", "-id"],
+                name="painting_active_popular_idx",
+                condition=models.Q(archive=False),
+            ),
+            # Работы художника по годам (?artist=&ordering=-year).
+            models.Index(
+                fields=["artist", "-year", "-id"],
+                name="painting_active_artist_idx",
+                condition=models.Q(archive=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.artist}"
@@ -88,6 +191,36 @@ class PaintingTag(models.Model):
         return f"{self.painting.title} — {self.tag.name}"
 
 
+class FavoriteQuerySet(models.QuerySet):
+    def insert_new(self, user_id, painting_ids):
+        """
+        Добавляет картины в избранное одним INSERT ... ON CONFLICT DO
+        NOTHING RETURNING и возвращает id только реально вставленных
+        строк: уже существующие (в том числе вставленные параллельным
+        запросом) не возвращаются. bulk_create(ignore_conflicts=True)
+        этого не сообщает. Postgres и SQLite ≥ 3.35; сигналов нет.
+        """
+        if not painting_ids:
+            return []
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        user = quote(meta.get_field("user").column)
+        painting = quote(meta.get_field("painting").column)
+        rows = ", ".join(["(%s, %s)"] * len(painting_ids))
+        params = [
+            value for pk in painting_ids for value in (user_id, pk)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(meta.db_table)} ({user}, {painting}) "
+                f"VALUES {rows} ON CONFLICT DO NOTHING "
+                f"RETURNING {painting}",
+                params,
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+
 class Favorite(models.Model):
     user = models.ForeignKey(
         "users.ArtPerspectiveUser",
@@ -98,6 +231,8 @@ class Favorite(models.Model):
         Painting, on_delete=models.CASCADE, verbose_name="Картина"
     )
 
+    objects = FavoriteQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -109,3 +244,61 @@ class Favorite(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.painting.title}"
+
+
+class PaintingSimilarity(models.Model):
+    painting = models.ForeignKey(
+        Painting,
+        on_delete=models.CASCADE,
+        related_name="neighbours",
+        verbose_name="Картина",
+    )
+    similar = models.ForeignKey(
+        Painting,
+        on_delete=models.CASCADE,
+        related_name="neighbour_of",
+        verbose_name="Похожая картина",
+    )
+    score = models.FloatField(verbose_name="Сходство")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["painting", "similar"], name="unique_similarity"
+            )
+        ]
+        indexes = [models.Index(fields=["painting", "-score"])]
+        verbose_name = "Похожая картина"
+        verbose_name_plural = "Похожие картины"
+
+    def __str__(self):
+        return f"{self.painting_id} ~ {self.similar_id} ({self.score})"
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(
+        "users.ArtPerspectiveUser",
+        on_delete=models.CASCADE,
+        related_name="recommendations",
+        verbose_name="Пользователь",
+    )
+    painting = models.ForeignKey(
+        Painting,
+        on_delete=models.CASCADE,
+        related_name="recommendations",
+        verbose_name="Картина",
+    )
+    score = models.FloatField(verbose_name="Оценка")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "painting"], name="unique_recommendation"
+            )
+        ]
+        indexes = [models.Index(fields=["user", "-score", "painting"])]
+        verbose_name = "Рекомендация"
+        verbose_name_plural = "Рекомендации"
+
+    def __str__(self):
+        return f"{self.user_id} → {self.painting_id} ({self.score})"
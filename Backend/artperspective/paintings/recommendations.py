@@ -0,0 +1,75 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Sum
+
+from paintings.models import Favorite, PaintingSimilarity, Recommendation
+
+# Сколько лучших кандидатов храним для пользователя.
+LIMIT = 500
+
+_pending = threading.local()
+
+
+def compute_recommendations(user_id):
+    """
+    Ранжирует кандидатов по сумме сходства с избранными картинами
+    пользователя. Читает только строки индекса похожих картин для его
+    избранного, поэтому не зависит от размера каталога.
+    """
+    favorites = Favorite.objects.filter(user_id=user_id).values(
+        "painting_id"
+    )
+    return (
+        PaintingSimilarity.objects.filter(painting_id__in=favorites)
+        .exclude(similar_id__in=favorites)
+        .filter(similar__archive=False)
+        .values_list("similar_id")
+        .annotate(total=Sum("score"))
+        .order_by("-total", "similar_id")[:LIMIT]
+    )
+
+
+def refresh_recommendations(user_id):
+    rows = [
+        Recommendation(user_id=user_id, painting_id=painting_id, score=score)
+        for painting_id, score in compute_recommendations(user_id)
+    ]
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id=user_id).delete()
+        Recommendation.objects.bulk_create(rows)
+
+
+def rebuild_recommendations():
+    """Пересчитывает рекомендации всех пользователей с избранным."""
+    user_ids = list(
+        get_user_model()
+        .objects.filter(favorite__isnull=False)
+        .distinct()
+        .values_list("pk", flat=True)
+    )
+    Recommendation.objects.exclude(user_id__in=user_ids).delete()
+    for user_id in user_ids:
+        refresh_recommendations(user_id)
+    return len(user_ids)
+
+
+def schedule_refresh(user_id):
+    """
+    Откладывает пересчёт до коммита; удаление нескольких избранных одной
+    транзакцией пересчитывает рекомендации пользователя один раз. Отказ
+    от колбэков при откате — как в similarity.schedule_refresh.
+    """
+    pending = getattr(_pending, "ids", None)
+    if pending is None:
+        pending = _pending.ids = set()
+    pending.add(user_id)
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending():
+    ids = getattr(_pending, "ids", None) or set()
+    _pending.ids = set()
+    for user_id in ids:
+        refresh_recommendations(user_id)
@@ -0,0 +1,88 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connection
+from django.db.models import OuterRef, Q, Subquery
+
+from paintings.models import Artist, Painting, PaintingTag
+
+# Конфигурация russian стеммит и кириллицу, и латиницу (english_stem).
+SEARCH_CONFIG = "russian"
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def search_document():
+    """
+    Выражение для Painting.search_vector: название (вес A), художник и
+    теги (B), описание (C). Связанные значения берутся подзапросами,
+    чтобы выражение годилось для UPDATE.
+    """
+    artist_name = Subquery(
+        Artist.objects.filter(pk=OuterRef("artist_id")).values("name")[:1]
+    )
+    tag_names = Subquery(
+        PaintingTag.objects.filter(painting_id=OuterRef("pk"))
+        .values("painting_id")
+        .annotate(names=StringAgg("tag__name", " "))
+        .values("names")
+    )
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(artist_name, weight="B", config=SEARCH_CONFIG)
+        + SearchVector(tag_names, weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset=None):
+    """Пересчитывает search_vector одним UPDATE; вне Postgres — no-op."""
+    if not is_supported():
+        return 0
+    if queryset is None:
+        queryset = Painting.objects.all()
+    return queryset.update(search_vector=search_document())
+
+
+def build_query(terms):
+    """
+    tsquery с префиксным совпадением по каждому слову — поиск работает
+    по мере набора. Из терминов оставляем только буквы и цифры.
+    """
+    words = [word for term in terms for word in re.findall(r"\w+", term)]
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+def search(queryset, terms):
+    """Полнотекстовый поиск по GIN-индексу search_vector."""
+    query = build_query(terms)
+    if query is None:
+        return queryset
+    return queryset.filter(search_vector=query)
+
+
+def fuzzy_search(queryset, terms):
+    """
+    Триграммы (pg_trgm, word_similarity) по названию и имени художника —
+    прощают опечатки. Запасной поиск: API обращается к нему, только если
+    страница полнотекстового поиска пуста (см. PaintingPagination).
+    """
+    text = " ".join(terms)
+    # Два подзапроса по триграммным GIN-индексам названия и имени: OR
+    # по двум таблицам в одном WHERE индексы не использует.
+    titles = Painting.objects.filter(title__trigram_word_similar=text)
+    artists = Painting.objects.filter(
+        artist__name__trigram_word_similar=text
+    )
+    return queryset.filter(
+        Q(pk__in=titles.values("pk")) | Q(pk__in=artists.values("pk"))
+    )
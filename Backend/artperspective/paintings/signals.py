@@ -0,0 +1,190 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from paintings import counters, recommendations
+from paintings.images import ready_field
+from paintings.models import Artist, Favorite, Painting, PaintingTag, Tags
+from paintings.search import update_search_vectors
+from paintings.similarity import schedule_refresh
+from paintings.tasks import process_image
+
+# Поля с изображениями, для которых строятся производные (srcset).
+IMAGE_FIELDS = {
+    Painting: ("image",),
+    Artist: ("image", "background"),
+    get_user_model(): ("avatar",),
+}
+
+
+def touch(paintings):
+    """
+    Теги не лежат в строке картины, поэтому их изменение сдвигает
+    updated_at явно: от него зависят ETag API и lastmod карты сайта.
+    """
+    paintings.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=PaintingTag)
+@receiver(post_delete, sender=PaintingTag)
+def painting_tag_changed(sender, instance, raw=False, **kwargs):
+    # loaddata сохраняет сырые строки — индекс пересобирается командой.
+    if raw:
+        return
+    schedule_refresh(instance.painting_id)
+    paintings = Painting.objects.filter(pk=instance.painting_id)
+    touch(paintings)
+    update_search_vectors(paintings)
+
+
+@receiver(m2m_changed, sender=Painting.tags.through)
+def painting_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_refresh(instance.pk)
+        paintings = Painting.objects.filter(pk=instance.pk)
+    elif pk_set:
+        for painting_id in pk_set:
+            schedule_refresh(painting_id)
+        paintings = Painting.objects.filter(pk__in=pk_set)
+    else:
+        return
+    touch(paintings)
+    update_search_vectors(paintings)
+
+
+@receiver(pre_save, sender=PaintingTag)
+def painting_tag_saving(sender, instance, raw=False, **kwargs):
+    # В инлайне админки тег в строке можно сменить: запоминаем прежний.
+    if raw or instance.pk is None:
+        return
+    instance.previous_tag_id = (
+        PaintingTag.objects.filter(pk=instance.pk)
+        .values_list("tag_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=PaintingTag)
+def painting_tag_counted(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.change_tag_paintings([instance.tag_id], 1)
+        return
+    previous = getattr(instance, "previous_tag_id", None)
+    if previous is not None and previous != instance.tag_id:
+        counters.change_tag_paintings([previous], -1)
+        counters.change_tag_paintings([instance.tag_id], 1)
+
+
+@receiver(post_delete, sender=PaintingTag)
+def painting_tag_uncounted(sender, instance, **kwargs):
+    counters.change_tag_paintings([instance.tag_id], -1)
+
+
+@receiver(m2m_changed, sender=Painting.tags.through)
+def painting_tags_counted(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    add() создаёт связи через bulk_create, без post_save; pk_set — только
+    новые связи. remove() и clear() удаляют строки через QuerySet.delete(),
+    их считает painting_tag_uncounted.
+    """
+    if action != "post_add":
+        return
+    tag_ids = [instance.pk] * len(pk_set) if reverse else pk_set
+    counters.change_tag_paintings(tag_ids, 1)
+
+
+@receiver(post_save, sender=Painting)
+def painting_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_search_vectors(Painting.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Artist)
+def artist_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    update_search_vectors(Painting.objects.filter(artist=instance))
+
+
+@receiver(post_save, sender=Tags)
+def tag_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    paintings = Painting.objects.filter(tags=instance)
+    touch(paintings)
+    update_search_vectors(paintings)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    recommendations.schedule_refresh(instance.user_id)
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_counted(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_favorites([instance.painting_id], 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_uncounted(sender, instance, **kwargs):
+    counters.change_favorites([instance.painting_id], -1)
+
+
+def image_changing(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Для нового файла производных ещё нет: флаг сбрасывается, и srcset
+    не отдаётся, пока их не построит process_image.
+    """
+    if raw:
+        return
+    fields = [
+        field
+        for field in IMAGE_FIELDS[sender]
+        if update_fields is None or field in update_fields
+    ]
+    if not fields:
+        return
+    previous = {}
+    if not instance._state.adding:
+        previous = (
+            sender.objects.filter(pk=instance.pk).values(*fields).first()
+            or {}
+        )
+    for field in fields:
+        image = getattr(instance, field)
+        if not image._committed or image.name != previous.get(field):
+            setattr(instance, ready_field(field), False)
+
+
+def image_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Декодирование и ресайз — в фоновой задаче, не в воркере запроса.
+    # Сохранение других полей (last_login при входе) задачу не ставит.
+    if raw:
+        return
+    for field in IMAGE_FIELDS[sender]:
+        if update_fields is not None and field not in update_fields:
+            continue
+        if getattr(instance, field) and not getattr(
+            instance, ready_field(field)
+        ):
+            process_image.delay(sender._meta.label, instance.pk, field)
+
+
+for model in IMAGE_FIELDS:
+    pre_save.connect(image_changing, sender=model)
+    post_save.connect(image_saved, sender=model)
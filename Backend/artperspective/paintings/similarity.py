@@ -0,0 +1,250 @@
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+from scipy import sparse
+
+from paintings import tasks
+from paintings.models import Painting, PaintingSimilarity, PaintingTag
+
+# Сколько ближайших соседей храним для каждой картины.
+TOP_K = 50
+# Сколько строк матрицы сходства считаем за один шаг.
+CHUNK_SIZE = 1024
+# Теги, которые есть больше чем у такой доли картин, не порождают
+# кандидатов в соседи (но учитываются в сходстве).
+MAX_DF = 0.02
+BATCH_SIZE = 5000
+
+_pending = threading.local()
+
+
+def tag_weights():
+    """
+    IDF-веса тегов по всему каталогу: редкий тег говорит о сходстве
+    больше, чем повсеместный «portrait».
+    """
+    total = Painting.objects.count()
+    counts = PaintingTag.objects.values_list("tag_id").annotate(
+        paintings=Count("painting_id")
+    )
+    return {
+        tag_id: np.log((1 + total) / (1 + paintings)) + 1.0
+        for tag_id, paintings in counts
+    }
+
+
+def build_matrix(pairs, weights):
+    """
+    Строит разреженную матрицу картина × тег с IDF-весами и
+    L2-нормированными строками, так что произведение строк — косинус.
+    Возвращает (id картин, матрица).
+    """
+    pairs = np.asarray(list(pairs), dtype=np.int64).reshape(-1, 2)
+    painting_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    tag_ids, cols = np.unique(pairs[:, 1], return_inverse=True)
+    values = np.array([weights[tag_id] for tag_id in tag_ids])[cols]
+    matrix = sparse.csr_matrix(
+        (values, (rows, cols)), shape=(len(painting_ids), len(tag_ids))
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return painting_ids, sparse.diags(1.0 / norms) @ matrix
+
+
+def _top_k_sparse(scores, top_k):
+    """Оставляет в каждой строке разреженной матрицы top_k наибольших."""
+    rows = np.repeat(np.arange(scores.shape[0]), np.diff(scores.indptr))
+    # Сходство лежит в [0, 1], поэтому один ключ сортирует по строке,
+    # а внутри строки — по убыванию сходства.
+    order = np.argsort(rows * 2.0 - scores.data, kind="stable")
+    rows, columns = rows[order], scores.indices[order]
+    rank = np.arange(len(order)) - scores.indptr[rows]
+    keep = rank < top_k
+    return rows[keep], columns[keep], scores.data[order][keep]
+
+
+def top_neighbours(painting_ids, matrix, rows=None, top_k=TOP_K):
+    """
+    Косинусное сходство выбранных строк со всей матрицей, блоками по
+    CHUNK_SIZE строк. Для каждого блока отдаёт массивы
+    (картины, похожие картины, сходство).
+
+    Кандидатов дают только теги, которые встречаются не более чем в
+    MAX_DF доле каталога (как max_df в TF-IDF): иначе тег вроде
+    «portrait» делает каждую строку плотной. В счёт сходства частые теги
+    входят полностью. Картины, у которых есть только частые теги,
+    считаются по уникальным наборам тегов против всего каталога.
+    """
+    if rows is None:
+        rows = np.arange(matrix.shape[0])
+    size = matrix.shape[0]
+    frequency = np.diff(matrix.tocsc().indptr)
+    common = frequency > max(MAX_DF * size, top_k)
+    rare = sparse.diags((~common).astype(matrix.dtype))
+    common_matrix = matrix[:, np.flatnonzero(common)].toarray()
+    rare_matrix = (matrix @ rare).tocsr()
+    rare_matrix.eliminate_zeros()
+    corpus = rare_matrix.T.tocsc()
+    has_rare = np.diff(rare_matrix.indptr) > 0
+
+    with_rare = rows[has_rare[rows]]
+    for start in range(0, len(with_rare), CHUNK_SIZE):
+        block = with_rare[start:start + CHUNK_SIZE]
+        scores = (rare_matrix[block] @ corpus).tocsr()
+        block_rows = np.repeat(block, np.diff(scores.indptr))
+        scores.data += np.einsum(
+            "ij,ij->i",
+            common_matrix[block_rows],
+            common_matrix[scores.indices],
+        )
+        scores.data[scores.indices == block_rows] = 0.0
+        scores.eliminate_zeros()
+        sources, targets, values = _top_k_sparse(scores, top_k)
+        yield painting_ids[block[sources]], painting_ids[targets], values
+
+    only_common = rows[~has_rare[rows]]
+    if not len(only_common):
+        return
+    signatures, groups = np.unique(
+        common_matrix[only_common], axis=0, return_inverse=True
+    )
+    groups = groups.ravel()
+    order = np.argsort(groups, kind="stable")
+    bounds = np.searchsorted(groups[order], np.arange(len(signatures) + 1))
+    columns = np.flatnonzero(common)
+    for index, signature in enumerate(signatures):
+        if not signature.any():
+            continue
+        full = np.zeros(matrix.shape[1])
+        full[columns] = signature
+        scores = matrix @ full
+        limit = min(top_k + 1, size)
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best])]
+        best = best[scores[best] > 0]
+        for row in only_common[order[bounds[index]:bounds[index + 1]]]:
+            targets = best[best != row][:top_k]
+            yield (
+                np.full(len(targets), painting_ids[row]),
+                painting_ids[targets],
+                scores[targets],
+            )
+
+
+def _write(blocks):
+    batch = []
+    for sources, targets, scores in blocks:
+        for painting_id, similar_id, score in zip(
+            sources.tolist(), targets.tolist(), scores.tolist()
+        ):
+            batch.append(
+                PaintingSimilarity(
+                    painting_id=painting_id,
+                    similar_id=similar_id,
+                    score=score,
+                )
+            )
+            if len(batch) >= BATCH_SIZE:
+                PaintingSimilarity.objects.bulk_create(batch)
+                batch = []
+    PaintingSimilarity.objects.bulk_create(batch)
+
+
+def rebuild_similarity(top_k=TOP_K):
+    """
+    Полностью пересобирает индекс похожих картин за один проход по
+    PaintingTag: матрица строится целиком в памяти, top-K каждой строки
+    выбирается векторно, результат пишется пачками. На синтетическом
+    каталоге (generate_catalogue) — около 0,5 с на 10 тыс. картин и
+    около 40 с на 100 тыс.: это офлайн-задача, а не запрос.
+    """
+    pairs = PaintingTag.objects.values_list("painting_id", "tag_id")
+    painting_ids, matrix = build_matrix(pairs.iterator(), tag_weights())
+    with transaction.atomic():
+        PaintingSimilarity.objects.all().delete()
+        if len(painting_ids):
+            _write(top_neighbours(painting_ids, matrix, top_k=top_k))
+    return len(painting_ids)
+
+
+def refresh_similarity(painting_ids, weights=None):
+    """
+    Пересчитывает строки индекса для переданных картин. Матрица строится
+    только по кандидатам — картинам, у которых есть общие теги. weights —
+    готовые tag_weights(), чтобы пачка не считала их на каждый вызов.
+    """
+    painting_ids = set(
+        Painting.objects.filter(pk__in=painting_ids).values_list(
+            "pk", flat=True
+        )
+    )
+    if not painting_ids:
+        return
+    tag_ids = PaintingTag.objects.filter(
+        painting_id__in=painting_ids
+    ).values("tag_id")
+    candidates = PaintingTag.objects.filter(tag_id__in=tag_ids).values(
+        "painting_id"
+    )
+    pairs = PaintingTag.objects.filter(
+        painting_id__in=candidates
+    ).values_list("painting_id", "tag_id")
+    with transaction.atomic():
+        PaintingSimilarity.objects.filter(
+            painting_id__in=painting_ids
+        ).delete()
+        pairs = list(pairs)
+        if not pairs:
+            return
+        ids, matrix = build_matrix(pairs, weights or tag_weights())
+        rows = np.flatnonzero(np.isin(ids, list(painting_ids)))
+        _write(top_neighbours(ids, matrix, rows=rows))
+
+
+def refresh_around(painting_ids):
+    """
+    Инкрементальное обновление после смены тегов картин: пересчитывает
+    их собственных соседей, а также картины, которые ссылались на них
+    раньше или попали в их новый top-K (сходство симметрично). IDF-веса
+    считаются один раз на всю пачку. Полная пересборка — команда
+    build_similarity.
+    """
+    painting_ids = set(painting_ids)
+    weights = tag_weights()
+    affected = set(
+        PaintingSimilarity.objects.filter(
+            similar_id__in=painting_ids
+        ).values_list("painting_id", flat=True)
+    )
+    refresh_similarity(painting_ids, weights)
+    affected.update(
+        PaintingSimilarity.objects.filter(
+            painting_id__in=painting_ids
+        ).values_list("similar_id", flat=True)
+    )
+    refresh_similarity(affected - painting_ids, weights)
+
+
+def schedule_refresh(painting_id):
+    """
+    Откладывает пересчёт до коммита транзакции: первый _flush_pending
+    ставит одну фоновую задачу refresh_similar на все накопленные id
+    (без повторов), остальные — пустые. Запрос не ждёт пересчёта.
+    Колбэк регистрируется при каждом вызове: при откате транзакции её
+    колбэки отбрасываются, и id, оставшиеся в _pending, пересчитает
+    следующий коммит (пересчёт идемпотентен), а не потеряются.
+    """
+    pending = getattr(_pending, "ids", None)
+    if pending is None:
+        pending = _pending.ids = set()
+    pending.add(painting_id)
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending():
+    ids = getattr(_pending, "ids", None) or set()
+    _pending.ids = set()
+    if ids:
+        tasks.refresh_similar.delay(sorted(ids))
@@ -1,24 +1,62 @@
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Max, Q
+
 from paintings.models import Painting, Artist
 
+# Протокол допускает до 50 000 адресов в файле; держим страницы меньше,
+# чтобы каждая собиралась одним коротким запросом.
+SITEMAP_LIMIT = 5000
+
 
 class PaintingSitemap(Sitemap):
     changefreq = "weekly"
     priority = 0.8
+    limit = SITEMAP_LIMIT
 
     def items(self):
-        return Painting.objects.all()
+        return Painting.active.only("id", "updated_at").order_by("id")
 
     def location(self, obj):
         return f"/detail/{obj.id}"
 
+    def lastmod(self, obj):
+        return obj.updated_at
+
+    def get_latest_lastmod(self):
+        # Для индекса: один агрегат вместо загрузки всех картин.
+        return self.items().aggregate(latest=Max("updated_at"))["latest"]
+
 
 class ArtistSitemap(Sitemap):
     changefreq = "monthly"
     priority = 0.6
+    limit = SITEMAP_LIMIT
 
     def items(self):
-        return Artist.objects.all()
+        # Страница художника меняется и вместе с его неархивными картинами.
+        return (
+            Artist.objects.annotate(
+                paintings_updated_at=Max(
+                    "paintings__updated_at",
+                    filter=Q(paintings__archive=False),
+                )
+            )
+            .only("id", "updated_at")
+            .order_by("id")
+        )
 
     def location(self, obj):
         return f"/artist/{obj.id}"
+
+    def lastmod(self, obj):
+        return max(filter(None, [obj.updated_at, obj.paintings_updated_at]))
+
+    def get_latest_lastmod(self):
+        artists = Artist.objects.aggregate(latest=Max("updated_at"))
+        paintings = Painting.active.aggregate(
+            latest=Max("updated_at")
+        )
+        return max(
+            filter(None, [artists["latest"], paintings["latest"]]),
+            default=None,
+        )
@@ -0,0 +1,39 @@
+from django.apps import apps
+
+from api.cache import bump_version
+from paintings import similarity
+from paintings.images import generate_derivatives, ready_field, strip_metadata
+from tasks.queue import task
+
+
+@task(max_attempts=3)
+def process_image(model_label, pk, field):
+    """
+    Фоновая обработка загруженного изображения: удаление EXIF и
+    построение производных для srcset. Затем ставится флаг
+    <поле>_derivatives — только если файл за это время не заменили.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    image = getattr(instance, field)
+    if not image:
+        return
+    strip_metadata(image.name, image.storage)
+    generate_derivatives(image.name, image.storage, force=True)
+    # update() без сигналов: сохранение снова поставило бы задачу.
+    marked = model.objects.filter(pk=pk, **{field: image.name}).update(
+        **{ready_field(field): True}
+    )
+    if marked:
+        # В ответах API появился srcset.
+        bump_version()
+
+
+@task(max_attempts=3)
+def refresh_similar(painting_ids):
+    """Пересчёт похожих для картин, у которых сменились теги."""
+    similarity.refresh_around(painting_ids)
+    # Закешированные ответы /similar/ построены по старому индексу.
+    bump_version()
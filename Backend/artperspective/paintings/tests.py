@@ -0,0 +1,331 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from api.serializers import PaintingSerializer
+from paintings import counters, similarity
+from paintings.images import strip_metadata
+from paintings.management.commands.import_catalogue import image_path
+from paintings.models import (
+    Artist,
+    Favorite,
+    Painting,
+    PaintingSimilarity,
+    PaintingTag,
+    Tags,
+)
+from paintings.tasks import process_image, refresh_similar
+from tasks.models import Task
+
+
+class ScheduleRefreshTests(TestCase):
+    def setUp(self):
+        similarity._pending.ids = set()
+        settings = override_settings(TASKS_EAGER=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def queued(self):
+        return list(Task.objects.values_list("name", "args"))
+
+    def test_once_per_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                similarity.schedule_refresh(12)
+                similarity.schedule_refresh(7)
+                similarity.schedule_refresh(12)
+        self.assertEqual(
+            self.queued(), [("paintings.tasks.refresh_similar", [[7, 12]])]
+        )
+
+    def test_after_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                similarity.schedule_refresh(12)
+                raise RuntimeError
+        self.assertEqual(self.queued(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            similarity.schedule_refresh(12)
+        self.assertEqual(
+            self.queued(), [("paintings.tasks.refresh_similar", [[12]])]
+        )
+
+    def test_weights_once_per_batch(self):
+        artist = Artist.objects.create(name="Artist", bio="")
+        tags = [Tags.objects.create(name=f"tag-{i}") for i in range(2)]
+        paintings = [
+            Painting.objects.create(
+                title=f"Painting {index}",
+                artist=artist,
+                year=1900,
+                description="",
+            )
+            for index in range(4)
+        ]
+        for painting in paintings:
+            painting.tags.set(tags)
+        with patch(
+            "paintings.similarity.tag_weights", wraps=similarity.tag_weights
+        ) as weights:
+            refresh_similar([painting.pk for painting in paintings])
+        weights.assert_called_once_with()
+        self.assertEqual(
+            PaintingSimilarity.objects.filter(
+                painting=paintings[0]
+            ).count(),
+            3,
+        )
+
+
+class ImagePathTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = os.path.realpath(directory.name)
+        self.images = os.path.join(self.root, "images")
+        os.mkdir(self.images)
+        os.symlink(self.root, os.path.join(self.images, "up"))
+
+    def test_inside(self):
+        self.assertEqual(
+            image_path(self.images, "a/b.jpg"),
+            os.path.join(self.images, "a", "b.jpg"),
+        )
+
+    def test_outside(self):
+        for name in ("../secret", "/etc/passwd", "up/secret"):
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    image_path(self.images, name)
+
+
+class StripMetadataTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FileSystemStorage(location=directory.name)
+        exif = Image.Exif()
+        exif[0x010F] = "Camera"
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, "JPEG", exif=exif)
+        self.original = buffer.getvalue()
+        self.name = self.storage.save("p.jpg", ContentFile(self.original))
+
+    def test_strip(self):
+        self.assertTrue(strip_metadata(self.name, self.storage))
+        with self.storage.open(self.name) as image:
+            self.assertFalse(Image.open(image).getexif())
+        self.assertEqual(self.storage.listdir("")[1], [self.name])
+
+    def test_original_kept_on_failure(self):
+        with patch("os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                strip_metadata(self.name, self.storage)
+        with self.storage.open(self.name) as image:
+            self.assertEqual(image.read(), self.original)
+        self.assertEqual(self.storage.listdir("")[1], [self.name])
+
+    def test_animation_kept(self):
+        exif = Image.Exif()
+        exif[0x010F] = "Camera"
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8)).save(
+            buffer,
+            "PNG",
+            save_all=True,
+            append_images=[Image.new("RGB", (8, 8), "red")],
+            exif=exif,
+        )
+        name = self.storage.save("a.png", ContentFile(buffer.getvalue()))
+        self.assertFalse(strip_metadata(name, self.storage))
+        with self.storage.open(name) as image:
+            self.assertEqual(image.read(), buffer.getvalue())
+
+
+class DerivativesReadyTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            MEDIA_ROOT=directory.name, TASKS_EAGER=False
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.painting = Painting.objects.create(
+            title="Painting",
+            artist=Artist.objects.create(name="Artist", bio=""),
+            year=1900,
+            description="",
+            image=self.upload(),
+        )
+
+    def upload(self):
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, "JPEG")
+        return ContentFile(buffer.getvalue(), name="p.jpg")
+
+    def srcset(self):
+        self.painting.refresh_from_db()
+        return PaintingSerializer(self.painting).data["image_srcset"]
+
+    def test_not_ready(self):
+        self.assertIsNone(self.srcset())
+        task = Task.objects.get()
+        self.assertEqual(task.name, "paintings.tasks.process_image")
+
+    def test_ready(self):
+        process_image("paintings.Painting", self.painting.pk, "image")
+        srcset = self.srcset()
+        self.assertIn("_320w.webp 320w", srcset["webp"])
+        self.assertIn("_1280w.jpg 1280w", srcset["jpg"])
+
+    def test_new_file_resets(self):
+        process_image("paintings.Painting", self.painting.pk, "image")
+        self.painting.refresh_from_db()
+        self.painting.image = self.upload()
+        self.painting.save()
+        self.assertIsNone(self.srcset())
+        self.assertEqual(Task.objects.count(), 2)
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        artist = Artist.objects.create(name="Artist", bio="")
+        self.paintings = [
+            Painting.objects.create(
+                title=f"Painting {index}",
+                artist=artist,
+                year=1900,
+                description="",
+            )
+            for index in range(2)
+        ]
+        self.artist = artist
+
+    def set_updated(self, painting, updated_at):
+        # update() без сигналов: отметку времени ставим точно.
+        Painting.objects.filter(pk=painting.pk).update(updated_at=updated_at)
+
+    def test_index_lastmod(self):
+        # Индекс отдаёт самую позднюю отметку раздела.
+        updated_at = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.set_updated(self.paintings[0], updated_at)
+        content = self.client.get("/sitemap.xml").content.decode()
+        self.assertIn("/sitemap-paintings.xml", content)
+        self.assertIn("/sitemap-artists.xml", content)
+        self.assertIn(f"<lastmod>{updated_at.isoformat()}</lastmod>", content)
+
+    def test_paintings(self):
+        first, second = self.paintings
+        self.set_updated(first, timezone.now() - timedelta(days=3))
+        content = self.client.get("/sitemap-paintings.xml").content.decode()
+        for painting in self.paintings:
+            self.assertIn(f"/detail/{painting.pk}</loc>", content)
+        first.refresh_from_db()
+        self.assertIn(
+            f"<lastmod>{first.updated_at.date().isoformat()}</lastmod>",
+            content,
+        )
+
+    def test_catalogue_change(self):
+        self.client.get("/sitemap-paintings.xml")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paintings[1].archive = True
+            self.paintings[1].save()
+        content = self.client.get("/sitemap-paintings.xml").content.decode()
+        self.assertIn(f"/detail/{self.paintings[0].pk}</loc>", content)
+        self.assertNotIn(f"/detail/{self.paintings[1].pk}</loc>", content)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        artist = Artist.objects.create(name="Artist", bio="Bio")
+        self.first, self.second = (
+            Painting.objects.create(
+                title=title, artist=artist, year=1900, description=""
+            )
+            for title in ("First", "Second")
+        )
+        self.red, self.blue = (
+            Tags.objects.create(name=name) for name in ("red", "blue")
+        )
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=name, password="x")
+            for name in ("viewer", "other")
+        ]
+
+    def favorites(self):
+        return [
+            Painting.objects.get(pk=painting.pk).favorites_count
+            for painting in (self.first, self.second)
+        ]
+
+    def tag_paintings(self):
+        return [
+            Tags.objects.get(pk=tag.pk).paintings_count
+            for tag in (self.red, self.blue)
+        ]
+
+    def test_favorites(self):
+        for user in self.users:
+            Favorite.objects.create(user=user, painting=self.first)
+        Favorite.objects.create(user=self.users[0], painting=self.second)
+        self.assertEqual(self.favorites(), [2, 1])
+        Favorite.objects.get(user=self.users[0], painting=self.first).delete()
+        self.assertEqual(self.favorites(), [1, 1])
+        Favorite.objects.filter(user=self.users[0]).delete()
+        self.assertEqual(self.favorites(), [1, 0])
+
+    def test_tags_m2m(self):
+        self.first.tags.add(self.red, self.blue)
+        self.red.paintings.add(self.second)
+        self.assertEqual(self.tag_paintings(), [2, 1])
+        self.first.tags.remove(self.red)
+        self.assertEqual(self.tag_paintings(), [1, 1])
+        self.blue.paintings.clear()
+        self.assertEqual(self.tag_paintings(), [1, 0])
+        self.first.tags.set([self.red, self.blue])
+        self.assertEqual(self.tag_paintings(), [2, 1])
+
+    def test_painting_tag_rows(self):
+        # Строки PaintingTag напрямую — как инлайн админки.
+        row = PaintingTag.objects.create(painting=self.first, tag=self.red)
+        self.assertEqual(self.tag_paintings(), [1, 0])
+        row.tag = self.blue
+        row.save()
+        self.assertEqual(self.tag_paintings(), [0, 1])
+        row.delete()
+        self.assertEqual(self.tag_paintings(), [0, 0])
+
+    def test_recount(self):
+        Favorite.objects.create(user=self.users[0], painting=self.first)
+        self.first.tags.add(self.red)
+        # Расхождение, как после правок в обход сигналов.
+        Painting.objects.filter(pk=self.first.pk).update(favorites_count=5)
+        Painting.objects.filter(pk=self.second.pk).update(favorites_count=2)
+        Tags.objects.filter(pk=self.blue.pk).update(paintings_count=3)
+        self.assertEqual(counters.recount(), (2, 1))
+        self.assertEqual(self.favorites(), [1, 0])
+        self.assertEqual(self.tag_paintings(), [1, 0])
+        self.assertEqual(counters.recount(), (0, 0))
+
+    def test_recount_command(self):
+        Tags.objects.filter(pk=self.red.pk).update(paintings_count=4)
+        output = StringIO()
+        call_command("recount_counters", stdout=output)
+        self.assertIn("тегов: 1", output.getvalue())
+        self.assertEqual(self.tag_paintings(), [0, 0])
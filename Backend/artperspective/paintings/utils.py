@@ -1,18 +1,17 @@
-from django.db.models import Count, Q
+from django.db.models import F
 
 from paintings.models import Painting
 
 
 def similar_to(painting):
-    tag_ids = painting.tags.values_list("id", flat=True)
+    """
+    Похожие картины из предрассчитанного индекса PaintingSimilarity
+    (см. paintings.similarity) — выборка по индексу вместо подсчёта
+    общих тегов по всему каталогу. Сходство — косинус IDF-векторов тегов.
+    """
     return (
-        Painting.objects.all()
-        .exclude(pk=painting.pk)  # кроме самой картины
-        .annotate(
-            shared_tags=Count(
-                "tags", filter=Q(tags__in=tag_ids)  # считаем ТОЛЬКО общие
-            )
-        )
-        .distinct()
-        .order_by("-shared_tags", "title")
+        Painting.active.with_related()
+        .filter(neighbour_of__painting=painting)
+        .annotate(similarity=F("neighbour_of__score"))
+        .order_by("-similarity", "title")
     )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.queue import run_pending
+
+
+class Command(BaseCommand):
+    help = "Воркер фоновых задач: выполняет очередь Task в цикле."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи и выйти.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Пауза между опросами пустой очереди, секунд.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            count = run_pending()
+            self.stdout.write(f"Выполнено задач: {count}.")
+            return
+        while True:
+            if not run_pending():
+                time.sleep(options["interval"])
@@ -0,0 +1,122 @@
+"""
+Простая очередь фоновых задач поверх таблицы Task — без брокера.
+
+Задача — обычная функция, помеченная @task; вызов func.delay(*args)
+кладёт строку в очередь в текущей транзакции, а воркер
+(manage.py run_tasks) забирает её, выполняет и при ошибке повторяет с
+экспоненциальной задержкой. Аргументы должны сериализоваться в JSON.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+# Задержка перед повтором: RETRY_DELAY * 2 ** (попытка - 1).
+RETRY_DELAY = timedelta(seconds=30)
+# Задача в статусе running дольше этого считается брошенной воркером.
+STALE_AFTER = timedelta(minutes=10)
+
+
+def task(func=None, *, max_attempts=3):
+    """Регистрирует функцию как фоновую задачу и добавляет ей .delay()."""
+
+    def decorate(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def delay(*args):
+            return enqueue(name, args, max_attempts=max_attempts)
+
+        func.delay = delay
+        return func
+
+    return decorate(func) if func is not None else decorate
+
+
+def enqueue(name, args=(), max_attempts=3):
+    if settings.TASKS_EAGER:
+        import_string(name)(*args)
+        return None
+    return Task.objects.create(
+        name=name, args=list(args), max_attempts=max_attempts
+    )
+
+
+def claim():
+    """
+    Забирает следующую готовую задачу, не мешая другим воркерам.
+    Брошенная задача, исчерпавшая попытки (воркер падал на каждой),
+    помечается failed, а не запускается снова.
+    """
+    now = timezone.now()
+    ready = Q(status=Task.Status.PENDING, run_after__lte=now) | Q(
+        status=Task.Status.RUNNING, updated_at__lt=now - STALE_AFTER
+    )
+    while True:
+        with transaction.atomic():
+            task = (
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(ready)
+                .order_by("run_after")
+                .first()
+            )
+            if task is None:
+                return None
+            if (
+                task.status == Task.Status.RUNNING
+                and task.attempts >= task.max_attempts
+            ):
+                logger.error(
+                    "Задача %s брошена воркером на последней попытке", task
+                )
+                task.status = Task.Status.FAILED
+                task.last_error = "Воркер не завершил последнюю попытку."
+                task.save(
+                    update_fields=["status", "last_error", "updated_at"]
+                )
+                continue
+            task.status = Task.Status.RUNNING
+            task.attempts += 1
+            task.save(update_fields=["status", "attempts", "updated_at"])
+        return task
+
+
+def execute(task):
+    try:
+        import_string(task.name)(*task.args)
+    except Exception:
+        logger.warning("Задача %s упала (попытка %s)", task, task.attempts)
+        task.last_error = traceback.format_exc()
+        if task.attempts < task.max_attempts:
+            task.status = Task.Status.PENDING
+            task.run_after = timezone.now() + RETRY_DELAY * 2 ** (
+                task.attempts - 1
+            )
+        else:
+            task.status = Task.Status.FAILED
+    else:
+        task.status = Task.Status.DONE
+        task.last_error = ""
+    task.save(
+        update_fields=["status", "run_after", "last_error", "updated_at"]
+    )
+
+
+def run_pending(limit=None):
+    """Выполняет готовые задачи по одной; возвращает их число."""
+    done = 0
+    while limit is None or done < limit:
+        task = claim()
+        if task is None:
+            break
+        execute(task)
+        done += 1
+    return done
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import RETRY_DELAY, STALE_AFTER, claim, run_pending, task
+
+
+@task(max_attempts=3)
+def failing():
+    raise ValueError("boom")
+
+
+@task
+def succeeding():
+    pass
+
+
+@override_settings(TASKS_EAGER=False)
+class QueueTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        clock = patch("django.utils.timezone.now", lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def enqueue(self, func):
+        # run_after по умолчанию ставит настоящие часы: тест идёт от них.
+        queued = func.delay()
+        self.now = queued.run_after
+        return queued
+
+    def test_done(self):
+        queued = self.enqueue(succeeding)
+        self.assertEqual(run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.DONE)
+        self.assertEqual(queued.attempts, 1)
+
+    def test_retry_backoff(self):
+        with self.assertLogs("tasks.queue", "WARNING"):
+            queued = self.enqueue(failing)
+            for attempt, delay in ((1, RETRY_DELAY), (2, RETRY_DELAY * 2)):
+                with self.subTest(attempt=attempt):
+                    self.assertEqual(run_pending(), 1)
+                    queued.refresh_from_db()
+                    self.assertEqual(queued.status, Task.Status.PENDING)
+                    self.assertEqual(queued.attempts, attempt)
+                    self.assertEqual(queued.run_after, self.now + delay)
+                    self.assertIn("ValueError: boom", queued.last_error)
+                    # До истечения задержки повтора нет.
+                    self.assertEqual(run_pending(), 0)
+                    self.now += delay
+            self.assertEqual(run_pending(), 1)
+            queued.refresh_from_db()
+            self.assertEqual(queued.status, Task.Status.FAILED)
+            self.assertEqual(queued.attempts, 3)
+            self.now += RETRY_DELAY * 8
+            self.assertEqual(run_pending(), 0)
+
+    def abandoned(self, attempts):
+        """Задача, воркер которой упал посреди попытки attempts."""
+        queued = self.enqueue(failing)
+        Task.objects.filter(pk=queued.pk).update(
+            status=Task.Status.RUNNING,
+            attempts=attempts,
+            updated_at=self.now - STALE_AFTER - RETRY_DELAY,
+        )
+        return queued
+
+    def test_stale_reclaimed(self):
+        queued = self.abandoned(1)
+        self.assertEqual(claim().pk, queued.pk)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.RUNNING)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_stale_exhausted(self):
+        queued = self.abandoned(3)
+        following = self.enqueue(succeeding)
+        with self.assertLogs("tasks.queue", "ERROR"):
+            self.assertEqual(claim().pk, following.pk)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.FAILED)
+        self.assertEqual(queued.attempts, 3)
+        self.assertIsNone(claim())
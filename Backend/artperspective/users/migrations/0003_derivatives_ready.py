@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_artperspectiveuser_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artperspectiveuser',
+            name='avatar_derivatives',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
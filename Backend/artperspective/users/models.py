@@ -4,3 +4,5 @@ from django.contrib.auth.models import AbstractUser
 
 class ArtPerspectiveUser(AbstractUser):
     avatar = models.ImageField(upload_to="avatars", blank=True, null=True)
+    # Производные аватара (srcset) построены, см. paintings.tasks.
+    avatar_derivatives = models.BooleanField(default=False, editable=False)
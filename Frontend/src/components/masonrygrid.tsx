@@ -1,6 +1,6 @@
 // src/components/MasonryGrid.tsx
-import React, { useState, useEffect } from "react";
-import { Card, addToast } from "@heroui/react";
+import React, { useState, useEffect, useRef } from "react";
+import { Button, Card, addToast } from "@heroui/react";
 import { Icon } from "@iconify/react";
 import {
   Painting,
@@ -17,24 +17,52 @@ interface MasonryGridProps {
   className?: string;
   /** Обработчик нажатия на карточку */
   onItemClick?: (id: number) => void;
+  /** Есть ли следующая страница (ссылка next) */
+  hasMore?: boolean;
+  /** Идёт загрузка страницы */
+  loading?: boolean;
+  /** Загрузить следующую страницу: вызывается у конца сетки */
+  onLoadMore?: () => void;
 }
 
 export const MasonryGrid: React.FC<MasonryGridProps> = ({
   items,
   className = "",
   onItemClick,
+  hasMore = false,
+  loading = false,
+  onLoadMore,
 }) => {
 
-  // Локальное состояние для мгновенного обновления UI
-  const [localItems, setLocalItems] = useState<Painting[]>(items);
+  // Локальные отметки избранного для мгновенного обновления UI; не
+  // сбрасываются, когда к items дописывается следующая страница.
+  const [favorites, setFavorites] = useState<Record<number, boolean>>({});
+  const localItems = items.map(item =>
+    item.id in favorites ? { ...item, is_favorite: favorites[item.id] } : item
+  );
 
-  // Синхронизируем пропсы с локальным стейтом при их изменении
+  // Бесконечная прокрутка: следующая страница грузится, когда конец
+  // сетки подходит к экрану.
+  const sentinel = useRef<HTMLDivElement>(null);
   useEffect(() => {
-    setLocalItems(items);
-  }, [items]);
+    const element = sentinel.current;
+    if (!element || !hasMore || !onLoadMore) return;
+    const observer = new IntersectionObserver(
+      entries => {
+        if (entries[0].isIntersecting) onLoadMore();
+      },
+      { rootMargin: "600px" }
+    );
+    observer.observe(element);
+    return () => observer.disconnect();
+  }, [hasMore, onLoadMore, items.length]);
 
   if (localItems.length === 0) {
-    return <div className="text-center py-8">Нет работ для отображения</div>;
+    return (
+      <div className="text-center py-8">
+        {loading ? "Загрузка..." : "Нет работ для отображения"}
+      </div>
+    );
   }
 
   // Переключить избранное и обновить локальные данные
@@ -55,11 +83,7 @@ export const MasonryGrid: React.FC<MasonryGridProps> = ({
       }
 
       // Мгновенно обновляем локальный список
-      setLocalItems(prev =>
-        prev.map(p =>
-          p.id === id ? { ...p, is_favorite: !isFavorite } : p
-        )
-      );
+      setFavorites(prev => ({ ...prev, [id]: !isFavorite }));
     } catch (error: any) {
       addToast({
         title: "Ошибка",
@@ -70,65 +94,85 @@ export const MasonryGrid: React.FC<MasonryGridProps> = ({
   };
 
   return (
-    <section
-      className={`w-full self-stretch columns-1 sm:columns-2 md:columns-3 lg:columns-4 xl:columns-5 gap-4 space-y-4 px-2 mx-auto max-w-none ${className}`}>
-      {localItems.map(item => (
-        <div key={item.id} className="break-inside-avoid w-full">
-          <Card
-            isHoverable
-            isPressable
-            shadow="md"
-            className="overflow-hidden group block m-0 w-full"
-            onPress={() => onItemClick?.(item.id)}
-          >
-            <div className="relative w-full">
-              <img
-                src={item.image}
-                alt={item.title}
-                className="w-full h-auto transition-transform duration-300 group-hover:scale-105"
-                loading="lazy"
-              />
-              <div className="absolute inset-0 bg-black/60 opacity-0 group-hover:opacity-100 transition-opacity duration-300 flex flex-col justify-between p-3">
-                <div className="flex-1 flex items-center justify-center pointer-events-none">
-                  <Icon icon="mdi:eye-outline" width="36" className="text-white/70" />
-                </div>
-                <div className="flex flex-wrap gap-2 items-end">
-                  {item.tags.slice(0, 3).map(tag => (
-                    <span
-                      key={tag}
-                      className="px-2 py-0.5 rounded-full bg-white/80 backdrop-blur-sm text-xs font-medium text-gray-800"
-                    >
-                      #{tag}
-                    </span>
-                  ))}
+    <>
+      <section
+        className={`w-full self-stretch columns-1 sm:columns-2 md:columns-3 lg:columns-4 xl:columns-5 gap-4 space-y-4 px-2 mx-auto max-w-none ${className}`}>
+        {localItems.map(item => (
+          <div key={item.id} className="break-inside-avoid w-full">
+            <Card
+              isHoverable
+              isPressable
+              shadow="md"
+              className="overflow-hidden group block m-0 w-full"
+              onPress={() => onItemClick?.(item.id)}
+            >
+              <div className="relative w-full">
+                <picture>
+                  {item.image_srcset && (
+                    <source
+                      type="image/webp"
+                      srcSet={item.image_srcset.webp}
+                      sizes="(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw"
+                    />
+                  )}
+                  <img
+                    src={item.image}
+                    srcSet={item.image_srcset?.jpg}
+                    sizes="(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw"
+                    alt={item.title}
+                    className="w-full h-auto transition-transform duration-300 group-hover:scale-105"
+                    loading="lazy"
+                  />
+                </picture>
+                <div className="absolute inset-0 bg-black/60 opacity-0 group-hover:opacity-100 transition-opacity duration-300 flex flex-col justify-between p-3">
+                  <div className="flex-1 flex items-center justify-center pointer-events-none">
+                    <Icon icon="mdi:eye-outline" width="36" className="text-white/70" />
+                  </div>
+                  <div className="flex flex-wrap gap-2 items-end">
+                    {item.tags.slice(0, 3).map(tag => (
+                      <span
+                        key={tag}
+                        className="px-2 py-0.5 rounded-full bg-white/80 backdrop-blur-sm text-xs font-medium text-gray-800"
+                      >
+                        #{tag}
+                      </span>
+                    ))}
+                  </div>
                 </div>
               </div>
-            </div>
-          </Card>
+            </Card>
 
-          <div className="flex items-start justify-between pt-2 px-1">
-            <div className="flex flex-col">
-              <span className="text-base font-normal leading-tight">{item.title}</span>
-              <span className="text-lg font-bold leading-tight">
-                {item.artist} · {item.year}
-              </span>
-            </div>
-            <RequireAuthButton
-              tooltip={item.is_favorite ? "Убрать из избранного" : "Добавить в избранное"}
-              onClick={() =>
-                handleToggleFavorite(item.id, !!item.is_favorite)
-              }
-            >
-              <Icon
-                icon={
-                  item.is_favorite ? "mdi:close" : "mdi:plus"
+            <div className="flex items-start justify-between pt-2 px-1">
+              <div className="flex flex-col">
+                <span className="text-base font-normal leading-tight">{item.title}</span>
+                <span className="text-lg font-bold leading-tight">
+                  {item.artist} · {item.year}
+                </span>
+              </div>
+              <RequireAuthButton
+                tooltip={item.is_favorite ? "Убрать из избранного" : "Добавить в избранное"}
+                onClick={() =>
+                  handleToggleFavorite(item.id, !!item.is_favorite)
                 }
-                width="27"
-              />
-            </RequireAuthButton>
+              >
+                <Icon
+                  icon={
+                    item.is_favorite ? "mdi:close" : "mdi:plus"
+                  }
+                  width="27"
+                />
+              </RequireAuthButton>
+            </div>
           </div>
+        ))}
+      </section>
+      {hasMore && onLoadMore && (
+        <div ref={sentinel} className="flex justify-center py-6">
+          <Button variant="flat" isLoading={loading} onPress={onLoadMore}>
+            Показать ещё
+          </Button>
         </div>
-      ))}
-    </section>
+      )}
+    </>
   );
 };
\ No newline at end of file
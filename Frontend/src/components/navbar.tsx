@@ -1,7 +1,8 @@
 // components/Navbar.tsx
 import { useState, useEffect, useCallback } from "react";
 import debounce from "lodash.debounce";
-import { searchPaintings, Painting } from "@/services/api";
+import { searchPaintings } from "@/services/api";
+import { usePaintingPages } from "@/hooks/usepaintingpages";
 import {
   Navbar as HeroUINavbar,
   NavbarContent,
@@ -9,6 +10,7 @@ import {
   NavbarMenuItem,
   NavbarMenuToggle,
 } from "@heroui/navbar";
+import { Button } from "@heroui/button";
 import { Input } from "@heroui/input";
 import { Link } from "@heroui/link";
 import { ThemeSwitch } from "@/components/theme-switch";
@@ -17,33 +19,41 @@ import { siteConfig } from "@/config/site";
 
 export const Navbar = () => {
   const [query, setQuery] = useState("");
-  const [paintings, setPaintings] = useState<Painting[]>([]);
+  const [search, setSearch] = useState("");
   const [open, setOpen] = useState(false);
   const [isMenuOpen, setIsMenuOpen] = useState(false);
 
   // Debounced fetch
   const fetchResults = useCallback(
-    debounce(async (q: string) => {
-      if (q.trim().length === 0) {
-        setPaintings([]);
-        return;
-      }
-      try {
-        const pl = await searchPaintings(q);
-        setPaintings(pl);
-      } catch (err) {
-        console.error("Search error:", err);
-        setPaintings([]);
-      }
-    }, 300),
+    debounce((q: string) => setSearch(q.trim()), 300),
     []
   );
 
+  // Первая страница результатов; следующие — кнопкой «Показать ещё»
+  const results = usePaintingPages(
+    () => searchPaintings(search),
+    [search],
+    search.length > 0
+  );
+  const paintings = search.length > 0 ? results.items : [];
+
   useEffect(() => {
     fetchResults(query);
     setOpen(query.trim().length > 0);
   }, [query, fetchResults]);
 
+  const moreButton = results.hasMore && (
+    <Button
+      size="sm"
+      variant="light"
+      className="w-full mt-1"
+      isLoading={results.loading}
+      onPress={results.loadMore}
+    >
+      Показать ещё
+    </Button>
+  );
+
   const handleSelect = () => {
     setOpen(false);
     setIsMenuOpen(false);
@@ -90,6 +100,7 @@ export const Navbar = () => {
                     {p.title} — {p.artist}
                   </Link>
                 ))}
+                {moreButton}
               </div>
             </div>
           )}
@@ -126,6 +137,7 @@ export const Navbar = () => {
                       {p.title} — {p.artist}
                     </Link>
                   ))}
+                  {moreButton}
                 </div>
               </div>
             )}
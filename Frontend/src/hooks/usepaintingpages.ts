@@ -0,0 +1,56 @@
+import { DependencyList, useCallback, useEffect, useRef, useState } from "react";
+import { Page, Painting, fetchNextPage } from "@/services/api";
+
+/**
+ * Список картин с курсорной пагинацией: первая страница — load(),
+ * следующие — loadMore() по ссылке next из предыдущего ответа.
+ * При смене deps список загружается заново.
+ */
+export function usePaintingPages(
+  load: () => Promise<Page<Painting>>,
+  deps: DependencyList,
+  enabled = true
+) {
+  const [items, setItems] = useState<Painting[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [loading, setLoading] = useState(false);
+  // Номер загрузки: ответы на запрос со старыми deps отбрасываются.
+  const generation = useRef(0);
+
+  useEffect(() => {
+    if (!enabled) return;
+    const current = ++generation.current;
+    setItems([]);
+    setNext(null);
+    setLoading(true);
+    load()
+      .then((page) => {
+        if (current !== generation.current) return;
+        setItems(page.results);
+        setNext(page.next);
+      })
+      .catch((err) => console.error("Ошибка при загрузке картин", err))
+      .finally(() => {
+        if (current === generation.current) setLoading(false);
+      });
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [enabled, ...deps]);
+
+  const loadMore = useCallback(() => {
+    if (!next || loading) return;
+    const current = generation.current;
+    setLoading(true);
+    fetchNextPage(next)
+      .then((page) => {
+        if (current !== generation.current) return;
+        setItems((prev) => [...prev, ...page.results]);
+        setNext(page.next);
+      })
+      .catch((err) => console.error("Ошибка при загрузке картин", err))
+      .finally(() => {
+        if (current === generation.current) setLoading(false);
+      });
+  }, [next, loading]);
+
+  return { items, hasMore: next !== null, loading, loadMore };
+}
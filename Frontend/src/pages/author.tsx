@@ -3,8 +3,14 @@ import { useParams, useNavigate } from "react-router-dom";
 
 import { Card, Image } from "@heroui/react";
 import DefaultLayout from "@/layouts/default";
-import { Artist, fetchArtistById } from "@/services/api";
+import {
+  Artist,
+  Painting,
+  fetchArtistById,
+  fetchArtistPaintings,
+} from "@/services/api";
 import { MasonryGrid } from "@/components/masonrygrid";
+import { usePaintingPages } from "@/hooks/usepaintingpages";
 import { Helmet } from "react-helmet-async";
 
 const AuthorPage: React.FC = () => {
@@ -17,6 +23,18 @@ const AuthorPage: React.FC = () => {
     fetchArtistById(Number(id)).then(setArtist);
   }, [id]);
 
+  // Все работы страницами, сгруппированные по году (порядок сохраняется).
+  const paintings = usePaintingPages(
+    () => fetchArtistPaintings(Number(id)),
+    [id],
+    !!id
+  );
+  const byYear: [number, Painting[]][] = [];
+  for (const painting of paintings.items) {
+    const last = byYear[byYear.length - 1];
+    if (last && last[0] === painting.year) last[1].push(painting);
+    else byYear.push([painting.year, [painting]]);
+  }
 
   if (!artist) return <div className="text-center py-8">Загрузка...</div>;
   const canonicalUrl = `https://yourdomain.com/artist/${artist.id}`;
@@ -73,10 +91,17 @@ const AuthorPage: React.FC = () => {
       {/* Работы по годам */}
       <h1 className="text-3xl font-bold text-center mt-24">Работы автора</h1>
       <div className="mt-12 space-y-12">
-        {Object.entries(artist.paintings_by_year).map(([year, paintings]) => (
+        {byYear.length === 0 && (
+          <MasonryGrid items={[]} loading={paintings.loading} />
+        )}
+        {byYear.map(([year, items], index) => (
           <div key={year}>
             <h2 className="text-2xl font-semibold mb-4">{year} год</h2>
-            <MasonryGrid items={paintings}
+            {/* Следующая страница подгружается у конца последней группы */}
+            <MasonryGrid items={items}
+            hasMore={index === byYear.length - 1 && paintings.hasMore}
+            loading={paintings.loading}
+            onLoadMore={paintings.loadMore}
             onItemClick={(id) => navigate(`/detail/${id}`)} />
           </div>
         ))}
@@ -6,6 +6,7 @@ import { Avatar, Image, Button, addToast } from "@heroui/react";
 import DefaultLayout from "@/layouts/default";
 import { Icon } from "@iconify/react";
 import { MasonryGrid } from "@/components/masonrygrid";
+import { usePaintingPages } from "@/hooks/usepaintingpages";
 import {
   Painting,
   Artist,
@@ -25,7 +26,6 @@ const ArtDetailPage: React.FC = () => {
   const location = useLocation();
 
   const [painting, setPainting] = useState<Painting | null>(null);
-  const [related, setRelated] = useState<Painting[]>([]);
   const [artist, setArtist] = useState<Artist | null>(null);
   const [isFullscreen, setIsFullscreen] = useState(false);
 
@@ -38,11 +38,14 @@ const ArtDetailPage: React.FC = () => {
       })
       .then(setArtist)
       .catch(console.error);
-    fetchSimilarPaintings(paintingId)
-      .then(setRelated)
-      .catch(console.error);
   }, [paintingId]);
 
+  const related = usePaintingPages(
+    () => fetchSimilarPaintings(paintingId),
+    [paintingId],
+    !!paintingId
+  );
+
   useEffect(() => {
     if (location.hash) {
       const el = document.getElementById(location.hash.slice(1));
@@ -198,7 +201,10 @@ const ArtDetailPage: React.FC = () => {
               </Button>
             </div>
             <MasonryGrid
-              items={related}
+              items={related.items}
+              hasMore={related.hasMore}
+              loading={related.loading}
+              onLoadMore={related.loadMore}
               onItemClick={pid => navigate(`/detail/${pid}#top`)}
             />
           </div>
@@ -1,19 +1,17 @@
-import { useState, useEffect, useContext } from "react";
+import { useState, useContext } from "react";
 import { useNavigate } from "react-router-dom";
 import {
   fetchPaintings,
   fetchRecommended,
-  Painting,
 } from "@/services/api";
 import { MasonryGrid } from "@/components/masonrygrid";
+import { usePaintingPages } from "@/hooks/usepaintingpages";
 import DefaultLayout from "@/layouts/default";
 import TabsCategories from "@/components/tabs";
 import { AuthContext } from "@/contexts/AuthContext";
 import { Helmet } from "react-helmet-async";
 
 const IndexPage = () => {
-  /** список картин, отображаемых в сетке */
-  const [paintings, setPaintings] = useState<Painting[]>([]);
   /** выбранный тег (id) или null, если «Все» */
   const [selectedTagId, setSelectedTagId] = useState<number | null>(null);
 
@@ -24,25 +22,26 @@ const IndexPage = () => {
    * Загружаем картины:
    *  – авторизованному пользователю — персональные рекомендации,
    *  – гостю — общий каталог.
-   * Фильтр по тегу добавляется через selectedTagId.
+   * Фильтр по тегу добавляется через selectedTagId. Следующие страницы
+   * подгружаются при прокрутке (см. MasonryGrid).
    */
-  useEffect(() => {
-    if (loading) return;
+  const paintings = usePaintingPages(
+    () => {
+      // выбираем функцию-«загрузчик» в зависимости от авторизации
+      const loader = isAuthenticated ? fetchRecommended : fetchPaintings;
 
-    // выбираем функцию-«загрузчик» в зависимости от авторизации
-    const loader = isAuthenticated ? fetchRecommended : fetchPaintings;
+      // если selectedTagId === null, передаем undefined
+      const tagForApi = selectedTagId ?? undefined;
 
-    // если selectedTagId === null, передаем undefined
-    const tagForApi = selectedTagId ?? undefined;
-
-    loader(tagForApi)
-      .then(setPaintings)
-      .catch((err) => {
+      return loader(tagForApi).catch((err) => {
         console.error("Ошибка при загрузке картин", err);
         // если рекомендации упали — загружаем общий список
-        return fetchPaintings(tagForApi).then(setPaintings);
+        return fetchPaintings(tagForApi);
       });
-  }, [isAuthenticated, loading, selectedTagId]);
+    },
+    [isAuthenticated, selectedTagId],
+    !loading
+  );
 
   return (
     <DefaultLayout>
@@ -73,7 +72,10 @@ const IndexPage = () => {
       {/* Сам «каменная» сетка работ */}
       <div className="px-4 py-6">
         <MasonryGrid
-          items={paintings}
+          items={paintings.items}
+          hasMore={paintings.hasMore}
+          loading={paintings.loading}
+          onLoadMore={paintings.loadMore}
           onItemClick={(id) => navigate(`/detail/${id}`)}
         />
       </div>
@@ -1,6 +1,6 @@
 "use client";
 
-import { useContext, useEffect, useState } from "react";
+import { useContext, useState } from "react";
 import { Navigate, useNavigate } from "react-router-dom";
 import { AuthContext } from "@/contexts/AuthContext";
 import { Avatar, Button, Spinner, addToast } from "@heroui/react";
@@ -8,9 +8,9 @@ import DefaultLayout from "@/layouts/default";
 import { Helmet } from "react-helmet-async";
 import {
   fetchFavorites,
-  Painting,
 } from "@/services/api";
 import { MasonryGrid } from "@/components/masonrygrid";
+import { usePaintingPages } from "@/hooks/usepaintingpages";
 import { ProfileEditModal } from "@/components/profileeditmodal";
 import type { UserProfile } from "@/services/api";
 
@@ -19,28 +19,21 @@ export default function ProfilePage() {
   // updateUser — функция для обновления данных пользователя в контексте
 
   const [isEditOpen, setEditOpen] = useState(false);
-  const [favorites, setFavorites] = useState<Painting[]>([]);
-  const [favLoading, setFavLoading] = useState(true);
   const navigate = useNavigate();
 
-  // Загрузка избранного
-  useEffect(() => {
-    if (!loading && isAuthenticated) {
-      (async () => {
-        try {
-          const data = await fetchFavorites();
-          setFavorites(data);
-        } catch (error: any) {
-          addToast({
-            title: "Ошибка",
-            description: error.response?.data?.detail || "Не удалось загрузить избранное.",
-          });
-        } finally {
-          setFavLoading(false);
-        }
-      })();
-    }
-  }, [loading, isAuthenticated]);
+  // Загрузка избранного: первая страница, следующие — при прокрутке
+  const favorites = usePaintingPages(
+    () =>
+      fetchFavorites().catch((error: any) => {
+        addToast({
+          title: "Ошибка",
+          description: error.response?.data?.detail || "Не удалось загрузить избранное.",
+        });
+        throw error;
+      }),
+    [],
+    !loading && isAuthenticated
+  );
 
   // Лоадер страницы
   if (loading) {
@@ -115,13 +108,16 @@ export default function ProfilePage() {
         <h2 className="text-xl font-medium mb-4 text-center">
           Ваши любимые работы
         </h2>
-        {favLoading ? (
+        {favorites.loading && favorites.items.length === 0 ? (
           <div className="flex justify-center py-8">
             <Spinner size="lg" />
           </div>
         ) : (
           <MasonryGrid
-            items={favorites}
+            items={favorites.items}
+            hasMore={favorites.hasMore}
+            loading={favorites.loading}
+            onLoadMore={favorites.loadMore}
             onItemClick={(id) => navigate(`/detail/${id}`)}
   // нужно реализовать внутри MasonryGrid и карточек
           />
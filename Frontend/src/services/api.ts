@@ -5,6 +5,11 @@
     AxiosHeaders,
   } from "axios";
 
+  export interface Srcset {
+    webp: string;
+    jpg: string;
+  }
+
   export interface Painting {
     id: number;
     title: string;
@@ -13,6 +18,7 @@
     artist_id: number;
     year: number;
     image: string;
+    image_srcset: Srcset | null;
     tags: string[];
     archive: boolean;
     is_favorite: boolean;
@@ -38,12 +44,19 @@
     bio: string;
     image: string;
     background: string;
+    // Только последние работы; все — fetchArtistPaintings.
     paintings_by_year: {
       [year: string]: Painting[];
     };
   }
 
 
+  export interface Page<T> {
+    next: string | null;
+    results: T[];
+  }
+
+
   const BASE_URL = "/api";
 
   const api: AxiosInstance = axios.create({
@@ -121,14 +134,23 @@
   export const fetchMe = () => api.get("/auth/users/me/");
 
   // === Картины ===
+  // Списки отдаются страницами: следующая — по ссылке next (курсор).
+  const activePage = (page: Page<Painting>): Page<Painting> => ({
+    ...page,
+    results: page.results.filter((p) => !p.archive),
+  });
+
+  const fetchPage = (url: string) =>
+    api.get<Page<Painting>>(url).then(({ data }) => activePage(data));
+
+  export const fetchNextPage = (next: string) => fetchPage(next);
+
   export const fetchPaintings = (tagId?: number) => {
     let url = "/paintings/";
     if (tagId != null) {
       url += `?tags=${tagId}`;
     }
-    return api.get<Painting[]>(url).then(({ data }) =>
-      data.filter((p) => !p.archive)
-    );
+    return fetchPage(url);
   };
 
   export const fetchRecommended = (tagId?: number) => {
@@ -136,9 +158,7 @@
     if (tagId != null) {
       url += `?tags=${tagId}`;
     }
-    return api.get<Painting[]>(url).then(({ data }) =>
-      data.filter((p) => !p.archive)
-    );
+    return fetchPage(url);
   };
 
 
@@ -146,14 +166,49 @@
     api.get<Painting>(`/paintings/${id}/`).then(({ data }) => data);
 
   export const searchPaintings = (query: string) =>
+    fetchPage(`/paintings/?search=${encodeURIComponent(query)}`);
+
+  export interface PaintingFilters {
+    tags?: number[];
+    tagsMatch?: "all" | "any";
+    artists?: number[];
+    yearMin?: number;
+    yearMax?: number;
+  }
+
+  export interface FacetCount {
+    id: number;
+    name: string;
+    count: number;
+  }
+
+  export interface Facets {
+    count: number;
+    tags: FacetCount[];
+    artists: FacetCount[];
+    decades: { decade: number; count: number }[];
+  }
+
+  const filterParams = (filters: PaintingFilters) => ({
+    tags: filters.tags?.length ? filters.tags.join(",") : undefined,
+    tags_match: filters.tagsMatch,
+    artist: filters.artists?.length ? filters.artists.join(",") : undefined,
+    year_min: filters.yearMin,
+    year_max: filters.yearMax,
+  });
+
+  export const filterPaintings = (filters: PaintingFilters) =>
     api
-      .get<Painting[]>(`/paintings/?search=${encodeURIComponent(query)}`)
-      .then(({ data }) => data.filter((p) => !p.archive));
+      .get<Page<Painting>>("/paintings/", { params: filterParams(filters) })
+      .then(({ data }) => data.results);
 
-  export const fetchSimilarPaintings = (id: number) =>
+  export const fetchFacets = (filters: PaintingFilters = {}) =>
     api
-      .get<Painting[]>(`/paintings/${id}/similar/`)
-      .then(({ data }) => data.filter((p) => !p.archive));
+      .get<Facets>("/paintings/facets/", { params: filterParams(filters) })
+      .then(({ data }) => data);
+
+  export const fetchSimilarPaintings = (id: number) =>
+    fetchPage(`/paintings/${id}/similar/`);
 
   // === Избранное ===
   export const addToFavorites = (id: number) =>
@@ -162,14 +217,34 @@
   export const removeFromFavorites = (id: number) =>
     api.delete<void>(`/paintings/${id}/favorite/`);
 
-  export const fetchFavorites = () =>
-    api.get<Painting[]>("/favorites/").then(({ data }) =>
-      data.filter((p) => !p.archive)
-    );
+  export const fetchFavorites = () => fetchPage("/favorites/");
+
+  export interface FavoritesChange {
+    added: number[];
+    removed: number[];
+  }
+
+  export const fetchFavoriteIds = () =>
+    api
+      .get<{ ids: number[] }>("/favorites/ids/")
+      .then(({ data }) => new Set(data.ids));
+
+  export const updateFavorites = (add: number[], remove: number[]) =>
+    api
+      .post<FavoritesChange>("/favorites/bulk/", { add, remove })
+      .then(({ data }) => data);
 
   // === Авторы ===
+  // Художники тоже отдаются страницами (курсор по имени).
   export const fetchArtists = () =>
-    api.get<Artist[]>("/artists/").then(({ data }) => data);
+    api.get<Page<Artist>>("/artists/").then(({ data }) => data);
+
+  export const fetchNextArtists = (next: string) =>
+    api.get<Page<Artist>>(next).then(({ data }) => data);
+
+  // Работы художника, новые по году первыми.
+  export const fetchArtistPaintings = (artistId: number) =>
+    fetchPage(`/paintings/?artist=${artistId}&ordering=-year`);
 
   export const fetchArtistById = (id: number) =>
     api.get<Artist>(`/artists/${id}/`).then(({ data }) => data);